@@ -0,0 +1,204 @@
+import argparse
+import csv
+import json
+import sqlite3
+import sys
+
+from database import DB_FILE, connect_readonly
+
+# Выгрузка статистики из game.db без открытия базы руками:
+#
+#   python analytics.py scores                    распределение счёта по сложностям
+#   python analytics.py skins                     популярность скинов
+#   python analytics.py sessions                  игры и игроки по дням
+#   python analytics.py leaderboard               топ игр по каждой сложности
+#   python analytics.py games --format jsonl      сырая история игр
+#   python analytics.py settings --out s.csv      сырая история настроек
+#
+# Результат читается курсором порциями по --chunk-size строк и сразу
+# пишется наружу, так что память не зависит от размера таблицы. База
+# открывается только на чтение и не мешает запущенной игре (WAL).
+
+DEFAULT_CHUNK_SIZE = 10000
+
+QUERIES = {
+    "scores": (
+        ["difficulty", "score", "games"],
+        """
+        SELECT difficulty, score, COUNT(*) AS games
+        FROM games
+        GROUP BY difficulty, score
+        ORDER BY difficulty, score
+        """,
+    ),
+    "skins": (
+        ["difficulty", "skin", "games", "players"],
+        """
+        SELECT difficulty, skin, COUNT(*) AS games, COUNT(DISTINCT player_name) AS players
+        FROM settings_history
+        GROUP BY difficulty, skin
+        ORDER BY difficulty, games DESC
+        """,
+    ),
+    "sessions": (
+        ["day", "games", "players", "best_score"],
+        """
+        SELECT date(timestamp) AS day, COUNT(*) AS games,
+               COUNT(DISTINCT player_name) AS players, MAX(score) AS best_score
+        FROM games
+        GROUP BY date(timestamp)
+        ORDER BY date(timestamp)
+        """,
+    ),
+    # Таблицу leaderboard держит триггер на games (database.py), так что
+    # это чтение пары десятков строк по индексу, а не сортировка истории
+    "leaderboard": (
+        ["difficulty", "place", "player_name", "score", "timestamp"],
+        """
+        SELECT difficulty,
+               ROW_NUMBER() OVER (
+                   PARTITION BY difficulty
+                   ORDER BY score DESC, timestamp DESC, game_id DESC
+               ) AS place,
+               player_name, score, timestamp
+        FROM leaderboard
+        ORDER BY difficulty, place
+        """,
+    ),
+    "games": (
+        ["id", "player_name", "score", "difficulty", "timestamp"],
+        """
+        SELECT id, player_name, score, difficulty, timestamp
+        FROM games
+        ORDER BY id
+        """,
+    ),
+    "settings": (
+        ["id", "player_name", "difficulty", "skin", "date"],
+        """
+        SELECT id, player_name, difficulty, skin, date
+        FROM settings_history
+        ORDER BY id
+        """,
+    ),
+}
+
+
+# Типы колонок для Parquet, по порядку колонок в QUERIES. Схема задаётся
+# явно, а не выводится из первой порции: колонка из одних NULL или счёт,
+# ставший дробным, иначе ломают запись следующих порций.
+PARQUET_TYPES = {
+    "scores": ("string", "int64", "int64"),
+    "skins": ("string", "string", "int64", "int64"),
+    "sessions": ("string", "int64", "int64", "int64"),
+    "leaderboard": ("string", "int64", "string", "int64", "string"),
+    "games": ("int64", "string", "int64", "string", "string"),
+    "settings": ("int64", "string", "string", "string", "string"),
+}
+
+
+def stream_rows(conn, sql, chunk_size):
+    # Запрос выполняется сразу, а не при первом чтении из генератора:
+    # ошибки SQL (например, нет json_object) вылетают здесь.
+    return iter_chunks(conn.execute(sql), chunk_size)
+
+
+def iter_chunks(cursor, chunk_size):
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield rows
+
+
+def write_csv(out, columns, chunks):
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    for rows in chunks:
+        writer.writerows(rows)
+
+
+def jsonl_sql(columns, sql):
+    # Строки JSON собирает сам SQLite (json_object) — в несколько раз
+    # быстрее, чем json.dumps на каждую строку в Python.
+    fields = ", ".join(f"'{name}', {name}" for name in columns)
+    return f"SELECT json_object({fields}) FROM ({sql})"
+
+
+def write_jsonl(out, columns, chunks):
+    for rows in chunks:
+        out.write("".join(
+            json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n" for row in rows
+        ))
+
+
+def write_json_lines(out, chunks):
+    for rows in chunks:
+        out.write("".join(row[0] + "\n" for row in rows))
+
+
+def write_parquet(path, columns, types, chunks):
+    # pyarrow не входит в зависимости игры — нужен только для этой выгрузки
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Для --format parquet установите pyarrow")
+
+    schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in zip(columns, types)])
+    # Писатель открываем сразу: пустой результат — валидный пустой файл
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in chunks:
+            arrays = [
+                pa.array(values, type=field.type)
+                for field, values in zip(schema, zip(*rows))
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+
+def export(report, fmt, out_path, db_path, chunk_size):
+    columns, sql = QUERIES[report]
+    conn = connect_readonly(db_path)
+    try:
+        if fmt == "parquet":
+            if not out_path:
+                raise SystemExit("Для --format parquet нужен --out")
+            write_parquet(out_path, columns, PARQUET_TYPES[report], stream_rows(conn, sql, chunk_size))
+            return
+
+        out = open(out_path, "w", encoding="utf-8", newline="") if out_path else sys.stdout
+        try:
+            if fmt == "csv":
+                write_csv(out, columns, stream_rows(conn, sql, chunk_size))
+                return
+            try:
+                # Сборки SQLite без JSON1 (старше 3.38) — собираем в Python
+                chunks = stream_rows(conn, jsonl_sql(columns, sql), chunk_size)
+            except sqlite3.OperationalError:
+                write_jsonl(out, columns, stream_rows(conn, sql, chunk_size))
+            else:
+                write_json_lines(out, chunks)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Статистика игр из game.db")
+    parser.add_argument("report", choices=sorted(QUERIES))
+    parser.add_argument("--format", choices=["csv", "jsonl", "parquet"], default="csv")
+    parser.add_argument("--out", help="файл для результата (по умолчанию stdout)")
+    parser.add_argument("--db", default=DB_FILE)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+    try:
+        export(args.report, args.format, args.out, args.db, args.chunk_size)
+    except BrokenPipeError:
+        # python analytics.py games | head — нормальный сценарий
+        sys.stderr.close()
+
+
+if __name__ == "__main__":
+    main()
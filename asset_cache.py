@@ -0,0 +1,158 @@
+import json
+import os
+import threading
+
+import arcade
+
+from simulation import PLAYER_SCALE
+from hitboxes import (
+    SKIN_FRAMES,
+    FALLBACK_TEXTURE,
+    DEFAULT_HIT_BOX_MODE,
+    file_digest,
+    get_hit_box,
+)
+
+# Общий на весь процесс реестр текстур и звуков. Всё грузится с диска
+# один раз (при старте, можно в фоновом потоке), дальше GameView,
+# смена дня/ночи и перезапуски берут готовые объекты из памяти.
+
+PIPE_TEXTURE = "assets/pipe-green.png"
+
+# Собирается build_atlas.py; если его нет, текстуры грузятся по файлам
+ATLAS_IMAGE = "assets/atlas.png"
+ATLAS_MANIFEST = "assets/atlas.json"
+
+BACKGROUND_TEXTURES = {
+    (False, True): "assets/background-day.png",
+    (False, False): "assets/background-night.png",
+    (True, True): "assets/easter_day.png",
+    (True, False): "assets/easter_night.png",
+}
+
+SOUND_WING = "assets/audio_wing.wav"
+SOUND_POINT = "assets/audio_point.wav"
+SOUND_HIT = "assets/audio_hit.wav"
+SOUND_FILES = [SOUND_WING, SOUND_POINT, SOUND_HIT]
+
+_textures = {}
+_sounds = {}
+_lock = threading.RLock()
+_preload_thread = None
+_atlas = None
+
+
+class CachedHitBoxAlgorithm(arcade.hitbox.HitBoxAlgorithm):
+    # Отдаёт текстуре готовые точки из кеша хитбоксов, чтобы arcade
+    # не пересчитывал контур по пикселям при каждой загрузке.
+    def __init__(self, points=(), scale=1.0):
+        super().__init__()
+        self.points = tuple((x / scale, y / scale) for x, y in points)
+        self._cache_name = f"CachedHitBox{hash(self.points)}"
+
+    def calculate(self, image, **kwargs):
+        return self.points
+
+
+def load_atlas(image_path=ATLAS_IMAGE, manifest_path=ATLAS_MANIFEST):
+    global _atlas
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        sheet = arcade.SpriteSheet(image_path)
+    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        _atlas = (None, {})
+        return _atlas
+
+    # Файл, изменившийся после сборки атласа, грузим отдельно, чтобы не
+    # показывать устаревшую картинку до пересборки. Если размер и mtime
+    # те же, что при сборке, файл не читаем; иначе сравниваем sha1 (тот же,
+    # что у кеша хитбоксов).
+    regions = {}
+    for path, region in manifest.get("regions", {}).items():
+        try:
+            if not source_unchanged(path, region):
+                continue
+        except OSError:
+            pass
+        regions[path] = region
+    _atlas = (sheet, regions)
+    return _atlas
+
+
+def source_unchanged(path, region):
+    stat = os.stat(path)
+    if stat.st_size == region.get("source_size") and stat.st_mtime_ns == region.get("source_mtime_ns"):
+        return True
+    return file_digest(path) == region.get("source_sha1")
+
+
+def _load_texture(path, hit_box_algorithm=None):
+    sheet, regions = _atlas if _atlas is not None else load_atlas()
+    region = regions.get(path)
+    if region is None:
+        return arcade.load_texture(path, hit_box_algorithm=hit_box_algorithm)
+    rect = arcade.LBWH(region["x"], region["y"], region["width"], region["height"])
+    return sheet.get_texture(rect, hit_box_algorithm=hit_box_algorithm)
+
+
+def background_path(easter_mode, is_day):
+    return BACKGROUND_TEXTURES[(bool(easter_mode), bool(is_day))]
+
+
+def get_texture(path):
+    with _lock:
+        texture = _textures.get(path)
+        if texture is None:
+            texture = _load_texture(path)
+            _textures[path] = texture
+        return texture
+
+
+def get_player_texture(path, mode=DEFAULT_HIT_BOX_MODE):
+    key = (path, mode)
+    with _lock:
+        texture = _textures.get(key)
+        if texture is None:
+            points = get_hit_box(path, PLAYER_SCALE, mode)
+            texture = _load_texture(path, CachedHitBoxAlgorithm(points, PLAYER_SCALE))
+            _textures[key] = texture
+        return texture
+
+
+def get_sound(path):
+    with _lock:
+        sound = _sounds.get(path)
+        if sound is None:
+            sound = arcade.load_sound(path)
+            _sounds[path] = sound
+        return sound
+
+
+def preload(mode=DEFAULT_HIT_BOX_MODE):
+    jobs = [(get_texture, PIPE_TEXTURE)]
+    jobs += [(get_texture, path) for path in BACKGROUND_TEXTURES.values()]
+    jobs += [(get_sound, path) for path in SOUND_FILES]
+    player_paths = {FALLBACK_TEXTURE}
+    for paths in SKIN_FRAMES.values():
+        player_paths.update(paths)
+    jobs += [(lambda path: get_player_texture(path, mode), path) for path in sorted(player_paths)]
+
+    for loader, path in jobs:
+        try:
+            loader(path)
+        except Exception as e:
+            print("Ошибка предзагрузки", path, e)
+
+
+def preload_in_background(mode=DEFAULT_HIT_BOX_MODE):
+    global _preload_thread
+    if _preload_thread is None:
+        _preload_thread = threading.Thread(target=preload, args=(mode,), name="asset-preload", daemon=True)
+        _preload_thread.start()
+    return _preload_thread
+
+
+def wait_for_preload(timeout=None):
+    if _preload_thread is not None:
+        _preload_thread.join(timeout)
@@ -0,0 +1,281 @@
+import numpy as np
+
+from simulation import (
+    BASE_GRAVITY,
+    BASE_JUMP_POWER,
+    BASE_PIPE_SPEED,
+    BASE_PIPE_WIDTH,
+    ANIMATION_SPEED,
+    ANIMATION_FRAME_COUNT,
+    ANGLE_LERP_SPEED,
+    PHYSICS_DT,
+    PLAYER_X,
+    PIPE_SPAWN_OFFSET,
+    difficulty_params,
+    DEFAULT_HIT_BOX,
+)
+from levelgen import SCHEDULE_CHUNK, get_schedule, random_seed
+
+# Те же правила, что в FlappySim, только для N птиц сразу: всё состояние
+# лежит в массивах NumPy, один step() двигает все партии одновременно.
+# Нужен для подбора параметров сложности миллионами ботовых игр.
+#
+# Трассы те же, что в игре: у каждой птицы свой сид, а зазоры берутся из
+# levelgen.get_schedule и заранее раскладываются в массив (птица, труба).
+# При заданном seed птица i летит по трассе FlappySim(seed=seed + i).
+
+
+def _pad_hit_boxes(hit_boxes):
+    # Хитбоксы кадров бывают с разным числом точек; дополняем повтором
+    # последней точки, а вырожденные рёбра потом маскируем.
+    size = max(len(box) for box in hit_boxes)
+    padded = np.empty((len(hit_boxes), size, 2), dtype=np.float64)
+    for i, box in enumerate(hit_boxes):
+        points = list(box) + [box[-1]] * (size - len(box))
+        padded[i] = points
+    return padded
+
+
+def _extents(values):
+    # min/max по короткой оси точек хитбокса: поэлементно по столбцам
+    # заметно быстрее, чем reduce по axis=1 на массиве (N, 8).
+    low = values[:, 0].copy()
+    high = low.copy()
+    for i in range(1, values.shape[1]):
+        np.minimum(low, values[:, i], out=low)
+        np.maximum(high, values[:, i], out=high)
+    return low, high
+
+
+class BatchSim:
+    def __init__(self, count, width, height, difficulty="medium", hit_boxes=None, seed=None):
+        self.count = count
+        self.width = width
+        self.height = height
+        self.difficulty = difficulty
+
+        params = difficulty_params(difficulty)
+        self.pipe_interval = params["pipe_interval"]
+        self.pipe_gap = params["pipe_gap"]
+
+        if hit_boxes is None:
+            hit_boxes = [DEFAULT_HIT_BOX] * ANIMATION_FRAME_COUNT
+        self.hit_boxes = _pad_hit_boxes(hit_boxes)
+
+        # Трубы выезжают раз в pipe_interval и уезжают за экран примерно
+        # через (ширина + отступ) / скорость шагов — больше пар на экране не бывает.
+        steps_between = int(self.pipe_interval / PHYSICS_DT) + 1
+        steps_visible = (width + PIPE_SPAWN_OFFSET + BASE_PIPE_WIDTH) / BASE_PIPE_SPEED
+        self.pipe_slots = int(steps_visible // steps_between) + 2
+
+        self.base_seed = seed
+        self.reset()
+
+    def reset(self, mask=None):
+        n = self.count
+        if mask is None:
+            mask = np.ones(n, dtype=bool)
+            self.bird_y = np.zeros(n)
+            self.bird_vy = np.zeros(n)
+            self.bird_angle = np.zeros(n)
+            self.frame = np.zeros(n, dtype=np.int64)
+            self.animation_timer = np.zeros(n)
+            self.time = np.zeros(n)
+            self.last_pipe_time = np.zeros(n)
+            self.seeds = np.zeros(n, dtype=np.int64)
+            self.schedules = [None] * n
+            self.gaps = np.zeros((n, SCHEDULE_CHUNK), dtype=np.int64)
+            self.spawned = np.zeros(n, dtype=np.int64)
+            self.pipe_x = np.zeros((n, self.pipe_slots))
+            self.pipe_gap_y = np.zeros((n, self.pipe_slots))
+            self.pipe_valid = np.zeros((n, self.pipe_slots), dtype=bool)
+            self.score = np.zeros(n, dtype=np.int64)
+            self.steps = np.zeros(n, dtype=np.int64)
+            self.alive = np.ones(n, dtype=bool)
+
+        self.bird_y[mask] = self.height // 2
+        self.bird_vy[mask] = 0.0
+        self.bird_angle[mask] = 0.0
+        self.frame[mask] = 0
+        self.animation_timer[mask] = 0.0
+        self.time[mask] = 0.0
+        self.last_pipe_time[mask] = 0.0
+        self.spawned[mask] = 0
+        self.pipe_valid[mask] = False
+        self.score[mask] = 0
+        self.steps[mask] = 0
+        self.alive[mask] = True
+
+        # seed=None — как в FlappySim, каждый reset() даёт птице новую трассу
+        for i in np.nonzero(mask)[0]:
+            if self.base_seed is None:
+                seed = random_seed()
+            else:
+                seed = self.base_seed + int(i)
+            self.seeds[i] = seed
+            self.schedules[i] = get_schedule(seed, self.difficulty, self.height)
+            self.fill_gaps(i, 0)
+
+    def fill_gaps(self, i, start):
+        schedule = self.schedules[i]
+        schedule.gap(self.gaps.shape[1] - 1)
+        self.gaps[i, start:] = schedule.gaps[start:self.gaps.shape[1]]
+
+    def grow_gaps(self):
+        # Кто-то пролетел все заготовленные трубы: удваиваем таблицу
+        start = self.gaps.shape[1]
+        self.gaps = np.concatenate([self.gaps, np.zeros_like(self.gaps)], axis=1)
+        for i in range(self.count):
+            self.fill_gaps(i, start)
+
+    def bird_polygons(self, index):
+        rad = np.radians(-self.bird_angle[index])
+        cos_a = np.cos(rad)[:, None]
+        sin_a = np.sin(rad)[:, None]
+        points = self.hit_boxes[self.frame[index]]
+        x = points[..., 0]
+        y = points[..., 1]
+        px = x * cos_a - y * sin_a + PLAYER_X
+        py = x * sin_a + y * cos_a + self.bird_y[index][:, None]
+        return px, py
+
+    def step(self, actions):
+        index = np.nonzero(self.alive)[0]
+        died = np.zeros(self.count, dtype=bool)
+        if index.size == 0:
+            return died
+
+        flap = np.asarray(actions, dtype=bool)[index]
+        vy = np.where(flap, float(BASE_JUMP_POWER), self.bird_vy[index]) - BASE_GRAVITY
+        self.bird_vy[index] = vy
+        self.bird_y[index] += vy
+        self.steps[index] += 1
+
+        fall_factor = np.minimum(1.0, np.abs(vy) / 12.0)
+        target_angle = np.where(vy > 0, -35.0, 70.0 * fall_factor)
+        angle = self.bird_angle[index]
+        angle = angle + (target_angle - angle) * ANGLE_LERP_SPEED * PHYSICS_DT
+        self.bird_angle[index] = np.clip(angle, -90, 45)
+
+        px, py = self.bird_polygons(index)
+        bottom, top = _extents(py)
+        out = (top < 0) | (bottom > self.height)
+        died[index[out]] = True
+
+        keep = ~out
+        index = index[keep]
+        if index.size:
+            self.pipe_x[index] -= BASE_PIPE_SPEED
+
+            passed = self.pipe_valid[index] & (self.pipe_x[index] + BASE_PIPE_WIDTH / 2 < 0)
+            self.pipe_valid[index] &= ~passed
+            self.score[index] += passed.sum(axis=1)
+
+            self.time[index] += PHYSICS_DT
+            spawn = self.time[index] - self.last_pipe_time[index] > self.pipe_interval
+            if spawn.any():
+                self.spawn_pipes(index[spawn])
+
+            timer = self.animation_timer[index] + PHYSICS_DT
+            tick = timer >= ANIMATION_SPEED
+            self.animation_timer[index] = np.where(tick, timer - ANIMATION_SPEED, timer)
+            self.frame[index] = np.where(tick, (self.frame[index] + 1) % ANIMATION_FRAME_COUNT, self.frame[index])
+
+            # Столкновение, как и в FlappySim, проверяется по уже новому кадру
+            px = px[keep]
+            py = py[keep]
+            if tick.any():
+                px[tick], py[tick] = self.bird_polygons(index[tick])
+
+            hit = self.check_collisions(index, px, py)
+            died[index[hit]] = True
+
+        self.alive &= ~died
+        return died
+
+    def spawn_pipes(self, index):
+        if self.spawned[index].max() >= self.gaps.shape[1]:
+            self.grow_gaps()
+        gap_y = self.gaps[index, self.spawned[index]]
+        slot = self.spawned[index] % self.pipe_slots
+        self.pipe_x[index, slot] = self.width + PIPE_SPAWN_OFFSET
+        self.pipe_gap_y[index, slot] = gap_y
+        self.pipe_valid[index, slot] = True
+        self.spawned[index] += 1
+        self.last_pipe_time[index] = self.time[index]
+
+    def check_collisions(self, index, px, py):
+        bird_left, bird_right = _extents(px)
+        bird_bottom, bird_top = _extents(py)
+
+        # Широкая фаза масками: по x с птицей может перекрываться не больше
+        # одной-двух пар, точный SAT считаем только для них.
+        pipe_x = self.pipe_x[index]
+        overlap = (
+            self.pipe_valid[index]
+            & (pipe_x - BASE_PIPE_WIDTH / 2 < bird_right[:, None])
+            & (pipe_x + BASE_PIPE_WIDTH / 2 > bird_left[:, None])
+        )
+
+        hit = np.zeros(index.size, dtype=bool)
+        for slot in range(self.pipe_slots):
+            rows = np.nonzero(overlap[:, slot])[0]
+            if rows.size == 0:
+                continue
+            left = pipe_x[rows, slot] - BASE_PIPE_WIDTH / 2
+            right = pipe_x[rows, slot] + BASE_PIPE_WIDTH / 2
+            gap_y = self.pipe_gap_y[index[rows], slot]
+            zeros = np.zeros(rows.size)
+            tops = np.full(rows.size, float(self.height))
+
+            for bottom, top in ((zeros, gap_y), (gap_y + self.pipe_gap, tops)):
+                candidates = (bird_bottom[rows] < top) & (bird_top[rows] > bottom)
+                if not candidates.any():
+                    continue
+                sub = rows[candidates]
+                hit[sub] |= self._polygons_hit_rects(
+                    px[sub], py[sub],
+                    left[candidates], right[candidates],
+                    bottom[candidates], top[candidates],
+                )
+        return hit
+
+    @staticmethod
+    def _polygons_hit_rects(px, py, left, right, bottom, top):
+        # SAT для выпуклого хитбокса против прямоугольника трубы. Оси самого
+        # прямоугольника уже проверены широкой фазой, остаются нормали рёбер птицы.
+        nx = np.roll(py, -1, axis=1) - py
+        ny = px - np.roll(px, -1, axis=1)
+        degenerate = (nx == 0) & (ny == 0)
+
+        proj = nx[:, :, None] * px[:, None, :] + ny[:, :, None] * py[:, None, :]
+        min_a = proj.min(axis=2)
+        max_a = proj.max(axis=2)
+
+        cx = np.stack([left, right, right, left], axis=1)
+        cy = np.stack([bottom, bottom, top, top], axis=1)
+        rect = nx[:, :, None] * cx[:, None, :] + ny[:, :, None] * cy[:, None, :]
+        min_b = rect.min(axis=2)
+        max_b = rect.max(axis=2)
+
+        separated = ((max_a <= min_b) | (max_b <= min_a)) & ~degenerate
+        return ~separated.any(axis=1)
+
+    def next_pipe(self):
+        # Ближайшая непройденная пара для каждой птицы: расстояние по x и
+        # центр зазора. Удобно для ботов.
+        right = np.where(self.pipe_valid, self.pipe_x + BASE_PIPE_WIDTH / 2, np.inf)
+        ahead = np.where(right >= PLAYER_X, right, np.inf)
+        slot = ahead.argmin(axis=1)
+        rows = np.arange(self.count)
+        has_pipe = np.isfinite(ahead[rows, slot])
+        dx = np.where(has_pipe, self.pipe_x[rows, slot] - PLAYER_X, self.width + PIPE_SPAWN_OFFSET - PLAYER_X)
+        gap_center = np.where(has_pipe, self.pipe_gap_y[rows, slot] + self.pipe_gap / 2, self.height / 2)
+        return dx, gap_center
+
+    def run(self, policy, max_steps=100000):
+        # policy(sim) -> массив bool длины count: кому из живых махать крыльями
+        while self.alive.any() and max_steps > 0:
+            self.step(policy(self))
+            max_steps -= 1
+        return self.score
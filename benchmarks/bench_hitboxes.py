@@ -0,0 +1,86 @@
+import argparse
+import time
+
+from PIL import Image, ImageDraw
+
+from hitboxes import HIT_BOX_MODES, SKIN_FRAMES, DEFAULT_HIT_BOX_MODE, load_hit_boxes, resolve_path
+from simulation import FlappySim, PipePair, PLAYER_SCALE, PLAYER_X, polygons_intersect
+
+# Сравнение режимов хитбокса с тем, что было в игре (simple):
+#   iou      — совпадение многоугольника с непрозрачными пикселями кадра
+#   points   — число вершин (от него линейно зависит цена SAT)
+#   sat_us   — одна проверка птица/труба в микросекундах
+#   steps/s  — скорость FlappySim целиком
+#   agree    — доля ботовых забегов с тем же счётом, что и в режиме simple
+#
+# Запуск из корня проекта: python -m benchmarks.bench_hitboxes
+
+
+def polygon_iou(path, polygon):
+    image = Image.open(resolve_path(path)).convert("RGBA")
+    alpha = image.getchannel("A").point(lambda a: 255 if a > 0 else 0)
+    width, height = image.size
+
+    # Точки хитбокса отсчитываются от центра текстуры, ось y смотрит вверх
+    mask = Image.new("L", image.size, 0)
+    points = [(x / PLAYER_SCALE + width / 2, height / 2 - y / PLAYER_SCALE) for x, y in polygon]
+    ImageDraw.Draw(mask).polygon(points, fill=255)
+
+    alpha_pixels = alpha.getdata()
+    mask_pixels = mask.getdata()
+    both = sum(1 for a, m in zip(alpha_pixels, mask_pixels) if a and m)
+    either = sum(1 for a, m in zip(alpha_pixels, mask_pixels) if a or m)
+    return both / either if either else 1.0
+
+
+def sat_time(hit_box, repeats):
+    pipe = PipePair(PLAYER_X + 40, 400, 220, 1080)
+    bottom, top = pipe.polygons()
+    polygon = [(x + PLAYER_X, y + 500) for x, y in hit_box]
+    started = time.perf_counter()
+    for _ in range(repeats):
+        polygons_intersect(polygon, bottom)
+        polygons_intersect(polygon, top)
+    return (time.perf_counter() - started) / (repeats * 2) * 1e6
+
+
+def bot_scores(hit_boxes, seeds, max_steps):
+    scores = []
+    steps = 0
+    started = time.perf_counter()
+    for seed in seeds:
+        sim = FlappySim(1920, 1080, "medium", hit_boxes=hit_boxes, seed=seed)
+        while not sim.game_over and sim.steps < max_steps:
+            pipe = sim.next_pipe()
+            target = pipe.gap_y + pipe.gap / 2 if pipe else sim.height / 2
+            sim.step(sim.bird_y < target - 40 and sim.bird_vy < 0)
+        scores.append(sim.score)
+        steps += sim.steps
+    return scores, steps / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк режимов хитбокса")
+    parser.add_argument("--skins", nargs="*", default=["robot", "bird", "plane"])
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--max-steps", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=20000)
+    args = parser.parse_args()
+
+    seeds = list(range(args.games))
+    print(f"{'skin':<8}{'mode':<10}{'points':>8}{'iou':>8}{'sat_us':>9}{'steps/s':>10}{'agree':>8}")
+    for skin in args.skins:
+        baseline, _ = bot_scores(load_hit_boxes(skin, mode=DEFAULT_HIT_BOX_MODE), seeds, args.max_steps)
+        for mode in HIT_BOX_MODES:
+            boxes = load_hit_boxes(skin, mode=mode)
+            paths = SKIN_FRAMES[skin]
+            iou = sum(polygon_iou(path, box) for path, box in zip(paths, boxes)) / len(boxes)
+            points = sum(len(box) for box in boxes) / len(boxes)
+            sat_us = sum(sat_time(box, args.repeats) for box in boxes) / len(boxes)
+            scores, rate = bot_scores(boxes, seeds, args.max_steps)
+            agree = sum(1 for a, b in zip(scores, baseline) if a == b) / len(seeds)
+            print(f"{skin:<8}{mode:<10}{points:>8.1f}{iou:>8.3f}{sat_us:>9.2f}{rate:>10.0f}{agree:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
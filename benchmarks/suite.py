@@ -0,0 +1,468 @@
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from simulation import FlappySim, PipePair, PLAYER_X
+
+# Набор бенчмарков горячих путей игры. Каждый бенчмарк отдаёт список
+# замеров одной операции (кадр, проверка, запись...) в секундах, по ним
+# считаются p50 / p99 / mean / min в мс; всё вместе пишется в JSON.
+#
+#   python -m benchmarks.suite                                  всё, результат в benchmarks/results/
+#   python -m benchmarks.suite --only pipes check_collisions
+#   python -m benchmarks.suite --baseline old.json              прогнать и сравнить с прошлым
+#   python -m benchmarks.suite --compare old.json new.json      только сравнить два файла
+#
+# Сравнение идёт по p50: бенчмарк, ставший медленнее больше чем на
+# --tolerance (по умолчанию 15%), — регрессия, код выхода 1.
+#
+# Запуск из корня проекта. Бенчмаркам с отрисовкой нужно окно; на машине
+# без дисплея — ARCADE_HEADLESS=1. База на 1M строк строится один раз и
+# лежит в benchmarks/.cache.
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+CACHE_DIR = os.path.join(BENCH_DIR, ".cache")
+
+DEFAULT_TOLERANCE = 0.15
+SCREEN_WIDTH = 1920
+SCREEN_HEIGHT = 1080
+
+BENCH_PLAYER = "player_0"
+BENCH_PLAYERS = 1000
+DB_BATCH = 50000
+
+BENCHMARKS = {}
+
+_window = None
+
+
+def benchmark(name):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def get_window():
+    # Одно скрытое окно на все бенчмарки с отрисовкой
+    global _window
+    if _window is None:
+        import arcade
+        _window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, "benchmarks", visible=False)
+    return _window
+
+
+def summarize(samples):
+    values = np.asarray(samples, dtype=np.float64) * 1000
+    p50, p99 = np.percentile(values, (50, 99))
+    return {
+        "unit": "ms",
+        "count": int(values.size),
+        "p50": float(p50),
+        "p99": float(p99),
+        "mean": float(values.mean()),
+        "min": float(values.min()),
+        "total": float(values.sum()),
+    }
+
+
+def immortal_sim(seed=1):
+    # Трасса и движение труб как в игре, но птица висит посередине и не
+    # разбивается: иначе забег кончается на первых сотнях кадров.
+    sim = FlappySim(SCREEN_WIDTH, SCREEN_HEIGHT, "medium", seed=seed)
+    sim.check_collisions = lambda polygon=None: False
+    return sim
+
+
+@benchmark("pipes")
+def bench_pipes(args):
+    # Появление и прокрутка труб: шаг FlappySim, пул спрайтов из
+    # gamescreen и сдвиг спрайтов за трубами, args.frames кадров.
+    import arcade
+    import asset_cache
+    from gamescreen import PipePool
+    from simulation import EVENT_SCORE, EVENT_SPAWN
+
+    get_window()
+    pipe_list = arcade.SpriteList()
+    pool = PipePool(pipe_list, asset_cache.get_texture(asset_cache.PIPE_TEXTURE))
+    sim = immortal_sim()
+
+    samples = []
+    perf_counter = time.perf_counter
+    for _ in range(args.frames):
+        start = perf_counter()
+        sim.bird_y = sim.height / 2
+        sim.bird_vy = 0
+        for event in sim.step():
+            if event == EVENT_SCORE:
+                pool.release_oldest()
+            elif event == EVENT_SPAWN:
+                pool.acquire(sim.pipes[-1])
+        for pipe, (top_pipe, bottom_pipe) in zip(sim.pipes, pool.active):
+            top_pipe.center_x = pipe.x
+            bottom_pipe.center_x = pipe.x
+        samples.append(perf_counter() - start)
+    return samples
+
+
+@benchmark("pipes_sim")
+def bench_pipes_sim(args):
+    # То же без спрайтов — только правила игры
+    sim = immortal_sim()
+    samples = []
+    perf_counter = time.perf_counter
+    for _ in range(args.frames):
+        start = perf_counter()
+        sim.bird_y = sim.height / 2
+        sim.bird_vy = 0
+        sim.step()
+        samples.append(perf_counter() - start)
+    return samples
+
+
+@benchmark("check_collisions")
+def bench_check_collisions(args):
+    # args.pipes пар одной колонной, половина уже позади птицы — так
+    # видно, во что обходится пропуск пролетевших труб в широкой фазе.
+    sim = FlappySim(SCREEN_WIDTH, SCREEN_HEIGHT, "medium", seed=1)
+    spacing = 300
+    first_x = PLAYER_X - spacing * (args.pipes // 2)
+    sim.pipes = [
+        PipePair(first_x + i * spacing, SCREEN_HEIGHT / 2 - sim.pipe_gap / 2, sim.pipe_gap, SCREEN_HEIGHT)
+        for i in range(args.pipes)
+    ]
+    polygon = sim.bird_polygon()
+
+    samples = []
+    perf_counter = time.perf_counter
+    for _ in range(args.frames):
+        start = perf_counter()
+        sim.check_collisions(polygon)
+        samples.append(perf_counter() - start)
+    return samples
+
+
+def live_particles(args):
+    from particles import ParticleSystem
+
+    get_window()
+    system = ParticleSystem(capacity=args.particles)
+    # Живут дольше замера, чтобы число частиц не падало по ходу
+    system.emit(
+        SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2, args.particles,
+        (-3, 3), (-3, 3), (2, 6), (1000, 1000),
+        [(255, 200, 0, 255), (255, 80, 0, 255), (255, 255, 255, 255)],
+    )
+    return system
+
+
+@benchmark("particles_update")
+def bench_particles_update(args):
+    system = live_particles(args)
+    samples = []
+    perf_counter = time.perf_counter
+    for _ in range(args.particle_frames):
+        start = perf_counter()
+        system.update(1 / 60)
+        samples.append(perf_counter() - start)
+    return samples
+
+
+@benchmark("particles_draw")
+def bench_particles_draw(args):
+    window = get_window()
+    system = live_particles(args)
+    samples = []
+    perf_counter = time.perf_counter
+    for _ in range(args.particle_frames):
+        system.update(1 / 60)
+        window.clear()
+        start = perf_counter()
+        system.draw()
+        window.ctx.finish()
+        samples.append(perf_counter() - start)
+    return samples
+
+
+def count_games(path):
+    import database
+
+    conn = database.connect_readonly(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def build_database(path, rows):
+    # Детерминированная история: BENCH_PLAYERS игроков, игры раз в 31 с
+    # (1M строк — около года). Вставка идёт через триггер, как в игре,
+    # поэтому best_scores и leaderboard тоже заполнены. Строится во
+    # временный файл и переименовывается, так что в кеше либо готовая
+    # база ровно на rows игр, либо ничего. Бенчмарки её не меняют.
+    import database
+    from settings_store import SKINS
+
+    if os.path.exists(path) and count_games(path) == rows:
+        return
+    tmp_path = path + ".tmp"
+    for leftover in (tmp_path, tmp_path + "-wal", tmp_path + "-shm"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+
+    conn = database.connect(tmp_path, synchronous="OFF")
+    try:
+        have = 0
+        rng = random.Random(rows)
+        difficulties = database.DIFFICULTIES
+        started = time.perf_counter()
+        while have < rows:
+            count = min(DB_BATCH, rows - have)
+            games = []
+            history = []
+            for i in range(have, have + count):
+                name = f"player_{i % BENCH_PLAYERS}"
+                difficulty = difficulties[i % 3]
+                stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(1700000000 + i * 31))
+                games.append((name, rng.randrange(200), difficulty, stamp))
+                history.append((name, difficulty, SKINS[i % len(SKINS)], stamp))
+            with conn:
+                conn.executemany(
+                    "INSERT INTO games (player_name, score, difficulty, timestamp) VALUES (?, ?, ?, ?)", games
+                )
+                conn.executemany(database.INSERT_SETTINGS_SQL, history)
+            have += count
+            print(f"  база: {have}/{rows} строк", file=sys.stderr)
+        print(f"  база построена за {time.perf_counter() - started:.1f} с", file=sys.stderr)
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+
+
+def bench_database_path(args):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f"games_{args.rows}.db")
+    build_database(path, args.rows)
+    return path
+
+
+@benchmark("save_game_result")
+def bench_save_game_result(args):
+    # database.save_game_result с ожиданием записи: замер — от постановки
+    # в очередь до коммита с fsync. Пишем в копию базы из кеша, чтобы
+    # каждый прогон начинался с одних и тех же данных.
+    import database
+
+    source = bench_database_path(args)
+    replay = bytes(300)
+    samples = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "game.db")
+        shutil.copyfile(source, path)
+        database.use_database(path)
+        try:
+            for i in range(args.writes):
+                start = time.perf_counter()
+                database.save_game_result(
+                    BENCH_PLAYER, i % 200, "medium", "robot", time.strftime("%Y-%m-%dT%H:%M:%S"), replay
+                )
+                database.flush_writes()
+                samples.append(time.perf_counter() - start)
+        finally:
+            database.use_database(database.DB_FILE)
+    return samples
+
+
+@benchmark("load_records_with_dates")
+def bench_load_records(args):
+    # То, что зовёт MenuView.load_records_with_dates(), на общем
+    # соединении модуля database, переключённом на базу бенчмарка.
+    import database
+
+    database.use_database(bench_database_path(args))
+    samples = []
+    try:
+        for i in range(args.reads):
+            start = time.perf_counter()
+            database.load_records(f"player_{i % BENCH_PLAYERS}")
+            samples.append(time.perf_counter() - start)
+    finally:
+        database.use_database(database.DB_FILE)
+    return samples
+
+
+@benchmark("settings_save")
+def bench_settings_save(args):
+    import settings_store
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = settings_store.Settings(os.path.join(tmp, "settings.json"))
+        samples = []
+        for i in range(args.writes):
+            start = time.perf_counter()
+            settings.set("volume", i % 100)
+            settings.flush()
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+@benchmark("settings_load")
+def bench_settings_load(args):
+    import settings_store
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "settings.json")
+        settings = settings_store.Settings(path)
+        settings.set("player_name", "benchmark")
+        settings.flush()
+        samples = []
+        for _ in range(args.reads):
+            start = time.perf_counter()
+            settings_store.Settings(path)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+@benchmark("cold_start")
+def bench_cold_start(args):
+    # Отдельный процесс на запуск: main.py --startup-report печатает
+    # отметку "first frame" (мс от старта startup.py) и с --quit-after-startup
+    # закрывается, как только фоновый старт закончен.
+    samples = []
+    for _ in range(args.starts):
+        result = subprocess.run(
+            [sys.executable, "main.py", "--startup-report", "--quit-after-startup"],
+            cwd=ROOT_DIR, capture_output=True, text=True, timeout=120,
+        )
+        match = re.search(r"^startup:\s+([\d.]+)\s+\|.*\|\s+first frame$", result.stderr, re.MULTILINE)
+        if result.returncode != 0 or match is None:
+            lines = result.stderr.strip().splitlines()
+            raise RuntimeError(lines[-1] if lines else f"код выхода {result.returncode}")
+        samples.append(float(match.group(1)) / 1000)
+    return samples
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(names, args):
+    results = {}
+    for name in names:
+        print(f"{name}...", file=sys.stderr)
+        try:
+            results[name] = summarize(BENCHMARKS[name](args))
+        except Exception as e:
+            # Бенчмарк, которому здесь не хватает окна или дисплея, не
+            # должен ронять остальные
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "frames": args.frames,
+            "pipes": args.pipes,
+            "particles": args.particles,
+            "particle_frames": args.particle_frames,
+            "rows": args.rows,
+            "writes": args.writes,
+            "reads": args.reads,
+            "starts": args.starts,
+        },
+        "results": results,
+    }
+
+
+def print_results(data):
+    print(f"{'benchmark':<26}{'p50 ms':>11}{'p99 ms':>11}{'mean ms':>11}{'count':>8}")
+    for name, result in data["results"].items():
+        if "error" in result:
+            print(f"{name:<26}  ошибка: {result['error']}")
+        else:
+            print(f"{name:<26}{result['p50']:>11.4f}{result['p99']:>11.4f}{result['mean']:>11.4f}{result['count']:>8}")
+
+
+def compare(old, new, tolerance=DEFAULT_TOLERANCE):
+    # Список регрессий: (имя, p50 было, p50 стало, во сколько раз медленнее)
+    regressions = []
+    print(f"{'benchmark':<26}{'old p50':>11}{'new p50':>11}{'change':>9}")
+    for name, result in new["results"].items():
+        before = old["results"].get(name)
+        if before is None or "error" in before or "error" in result:
+            continue
+        ratio = result["p50"] / before["p50"] if before["p50"] > 0 else 1.0
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append((name, before["p50"], result["p50"], ratio))
+            flag = "  РЕГРЕССИЯ"
+        print(f"{name:<26}{before['p50']:>11.4f}{result['p50']:>11.4f}{(ratio - 1) * 100:>+8.1f}%{flag}")
+    if old.get("params") != new.get("params"):
+        print("внимание: параметры прогонов различаются", file=sys.stderr)
+    return regressions
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки горячих путей игры")
+    parser.add_argument("--only", nargs="*", choices=list(BENCHMARKS), help="какие бенчмарки запускать")
+    parser.add_argument("--out", help="куда записать JSON (по умолчанию benchmarks/results/bench_<время>.json)")
+    parser.add_argument("--baseline", help="JSON прошлого прогона для сравнения")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="сравнить два JSON без прогона")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="допустимое замедление p50 (0.15 = 15%%)")
+    parser.add_argument("--frames", type=int, default=10000)
+    parser.add_argument("--pipes", type=int, default=1000)
+    parser.add_argument("--particles", type=int, default=4000)
+    parser.add_argument("--particle-frames", type=int, default=600)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--starts", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compare(load_results(args.compare[0]), load_results(args.compare[1]), args.tolerance)
+        sys.exit(1 if regressions else 0)
+
+    data = run(args.only or list(BENCHMARKS), args)
+    print_results(data)
+
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, time.strftime("bench_%Y%m%d_%H%M%S.json"))
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+    print(f"Результаты: {out}", file=sys.stderr)
+
+    if args.baseline:
+        regressions = compare(load_results(args.baseline), data, args.tolerance)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
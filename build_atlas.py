@@ -0,0 +1,118 @@
+import argparse
+import json
+import os
+
+from PIL import Image
+
+from asset_cache import (
+    ATLAS_IMAGE,
+    ATLAS_MANIFEST,
+    PIPE_TEXTURE,
+    BACKGROUND_TEXTURES,
+)
+from hitboxes import SKIN_FRAMES, file_digest
+
+# Сборка ассетов: все игровые текстуры (кадры скинов, труба, фоны)
+# укладываются полками в один atlas.png, а atlas.json хранит для каждого
+# исходного файла его прямоугольник и UV. asset_cache режет текстуры из
+# атласа, если он собран, иначе грузит отдельные файлы как раньше.
+#
+# Перезапускать после изменения чего-либо в assets/: python build_atlas.py
+
+PADDING = 2
+ATLAS_WIDTHS = (1024, 2048, 4096, 8192)
+
+
+def atlas_sources():
+    paths = [PIPE_TEXTURE]
+    paths += BACKGROUND_TEXTURES.values()
+    for frames in SKIN_FRAMES.values():
+        paths += frames
+    seen = set()
+    return [p for p in paths if not (p in seen or seen.add(p))]
+
+
+def pack(sizes, width):
+    # Полочная упаковка: самые высокие картинки первыми, слева направо,
+    # новая полка — когда текущая заполнилась по ширине.
+    order = sorted(sizes, key=lambda path: (-sizes[path][1], path))
+    positions = {}
+    x = y = shelf_height = 0
+    for path in order:
+        w, h = sizes[path]
+        if w + 2 * PADDING > width:
+            return None, None
+        if x + w + 2 * PADDING > width:
+            y += shelf_height
+            x = shelf_height = 0
+        positions[path] = (x + PADDING, y + PADDING)
+        x += w + 2 * PADDING
+        shelf_height = max(shelf_height, h + 2 * PADDING)
+    return positions, y + shelf_height
+
+
+def build(image_path=ATLAS_IMAGE, manifest_path=ATLAS_MANIFEST):
+    images = {}
+    for path in atlas_sources():
+        try:
+            images[path] = Image.open(path).convert("RGBA")
+        except (FileNotFoundError, OSError) as e:
+            print("Пропускаю", path, e)
+    sizes = {path: image.size for path, image in images.items()}
+
+    # Берём самую узкую ширину, при которой атлас не выше её самой
+    for width in ATLAS_WIDTHS:
+        positions, height = pack(sizes, width)
+        if positions is not None and height <= width:
+            break
+    else:
+        largest = sorted(sizes, key=lambda path: -sizes[path][0] * sizes[path][1])[:3]
+        raise SystemExit(
+            f"Текстуры не помещаются в атлас {ATLAS_WIDTHS[-1]}x{ATLAS_WIDTHS[-1]}; "
+            f"самые большие: " + ", ".join(f"{path} {sizes[path][0]}x{sizes[path][1]}" for path in largest)
+        )
+
+    atlas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    regions = {}
+    for path, (x, y) in positions.items():
+        image = images[path]
+        w, h = image.size
+        atlas.paste(image, (x, y))
+        stat = os.stat(path)
+        regions[path] = {
+            "x": x,
+            "y": y,
+            "width": w,
+            "height": h,
+            # UV в соглашении OpenGL: начало координат внизу слева
+            "uv": [x / width, 1 - (y + h) / height, (x + w) / width, 1 - y / height],
+            # Размер и mtime — быстрая проверка при старте, sha1 — когда они
+            # не совпали (файл скопирован, touch, пересохранён без изменений)
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+            "source_sha1": file_digest(path),
+        }
+
+    atlas.save(image_path, optimize=True)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "image": os.path.basename(image_path),
+            "width": width,
+            "height": height,
+            "origin": "top-left",
+            "regions": regions,
+        }, f, indent=4)
+    return width, height, len(regions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Собрать атлас текстур")
+    parser.add_argument("--image", default=ATLAS_IMAGE)
+    parser.add_argument("--manifest", default=ATLAS_MANIFEST)
+    args = parser.parse_args()
+    width, height, count = build(args.image, args.manifest)
+    print(f"Атлас {width}x{height}: {count} текстур -> {args.image}, {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
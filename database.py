@@ -0,0 +1,413 @@
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+
+# Одно долгоживущее соединение с game.db на весь процесс вместо
+# connect/close в каждом запросе. Схема создаётся и обновляется
+# миграциями по PRAGMA user_version.
+
+DB_FILE = "game.db"
+
+_path = DB_FILE
+_connection = None
+_writer = None
+_init_thread = None
+
+WRITER_MAX_BATCH = 256
+LEADERBOARD_SIZE = 10
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+def _migration_1(c):
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS games (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player_name TEXT NOT NULL,
+            score INTEGER NOT NULL,
+            difficulty TEXT DEFAULT 'medium',
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # В самых старых базах games создавалась ещё без сложности
+    columns = [row[1] for row in c.execute("PRAGMA table_info(games)")]
+    if "difficulty" not in columns:
+        c.execute("ALTER TABLE games ADD COLUMN difficulty TEXT DEFAULT 'medium'")
+
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS settings_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player_name TEXT NOT NULL,
+            difficulty TEXT NOT NULL,
+            skin TEXT NOT NULL,
+            date TEXT NOT NULL
+        )
+    ''')
+
+
+def _migration_2(c):
+    # Покрывающий индекс: рекорд игрока на сложности и дата рекорда
+    # читаются прямо из индекса, без обхода всей таблицы games.
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_games_player_difficulty_score
+        ON games (player_name, difficulty, score DESC, timestamp DESC)
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_settings_history_date
+        ON settings_history (date)
+    ''')
+
+
+def _migration_3(c):
+    # Рекорды и топ поддерживаются триггером при каждой вставке в games,
+    # так что меню и перезапуск читают одну строку, а не сканируют историю.
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS best_scores (
+            player_name TEXT NOT NULL,
+            difficulty TEXT NOT NULL,
+            score INTEGER NOT NULL,
+            timestamp DATETIME,
+            game_id INTEGER NOT NULL,
+            PRIMARY KEY (player_name, difficulty)
+        ) WITHOUT ROWID
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS leaderboard (
+            difficulty TEXT NOT NULL,
+            game_id INTEGER NOT NULL,
+            player_name TEXT NOT NULL,
+            score INTEGER NOT NULL,
+            timestamp DATETIME,
+            PRIMARY KEY (difficulty, game_id)
+        )
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_leaderboard_rank
+        ON leaderboard (difficulty, score DESC, timestamp DESC)
+    ''')
+
+    # При равном счёте рекордом считается более поздняя игра — как и
+    # в прежнем запросе с ORDER BY timestamp DESC.
+    c.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS games_after_insert AFTER INSERT ON games
+        BEGIN
+            INSERT INTO best_scores (player_name, difficulty, score, timestamp, game_id)
+            VALUES (NEW.player_name, NEW.difficulty, NEW.score, NEW.timestamp, NEW.id)
+            ON CONFLICT (player_name, difficulty) DO UPDATE SET
+                score = excluded.score,
+                timestamp = excluded.timestamp,
+                game_id = excluded.game_id
+            WHERE excluded.score >= best_scores.score;
+
+            INSERT INTO leaderboard (difficulty, game_id, player_name, score, timestamp)
+            VALUES (NEW.difficulty, NEW.id, NEW.player_name, NEW.score, NEW.timestamp);
+
+            DELETE FROM leaderboard
+            WHERE difficulty = NEW.difficulty
+              AND game_id NOT IN (
+                  SELECT game_id FROM leaderboard
+                  WHERE difficulty = NEW.difficulty
+                  ORDER BY score DESC, timestamp DESC, game_id DESC
+                  LIMIT {LEADERBOARD_SIZE}
+              );
+        END
+    ''')
+
+    # Заполняем по уже накопленной истории
+    c.execute('''
+        INSERT OR REPLACE INTO best_scores (player_name, difficulty, score, timestamp, game_id)
+        SELECT player_name, difficulty, score, timestamp, id FROM (
+            SELECT *, ROW_NUMBER() OVER (
+                PARTITION BY player_name, difficulty
+                ORDER BY score DESC, timestamp DESC, id DESC
+            ) AS place
+            FROM games
+        )
+        WHERE place = 1
+    ''')
+    c.execute(f'''
+        INSERT OR REPLACE INTO leaderboard (difficulty, game_id, player_name, score, timestamp)
+        SELECT difficulty, id, player_name, score, timestamp FROM (
+            SELECT *, ROW_NUMBER() OVER (
+                PARTITION BY difficulty
+                ORDER BY score DESC, timestamp DESC, id DESC
+            ) AS place
+            FROM games
+        )
+        WHERE place <= {LEADERBOARD_SIZE}
+    ''')
+
+
+def _migration_4(c):
+    # Индексы под агрегаты analytics.py: группировки идут по индексу
+    # в нужном порядке, без сортировки всей истории во временном B-дереве.
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_games_difficulty_score
+        ON games (difficulty, score)
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_games_day
+        ON games (date(timestamp), player_name, score)
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_settings_history_difficulty_skin
+        ON settings_history (difficulty, skin, player_name)
+    ''')
+
+
+def _migration_5(c):
+    # Повтор забега (replay.py) рядом со строкой games — несколько сотен байт
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS replays (
+            game_id INTEGER PRIMARY KEY REFERENCES games (id) ON DELETE CASCADE,
+            data BLOB NOT NULL
+        )
+    ''')
+
+
+MIGRATIONS = [
+    _migration_1,
+    _migration_2,
+    _migration_3,
+    _migration_4,
+    _migration_5,
+]
+
+BEST_SCORE_SQL = """
+    SELECT score FROM best_scores
+    WHERE player_name = ? AND difficulty = ?
+"""
+
+RECORDS_SQL = """
+    SELECT difficulty, score, timestamp
+    FROM best_scores
+    WHERE player_name = ?
+"""
+
+INSERT_GAME_SQL = "INSERT INTO games (player_name, score, difficulty) VALUES (?, ?, ?)"
+INSERT_SETTINGS_SQL = "INSERT INTO settings_history (player_name, difficulty, skin, date) VALUES (?, ?, ?, ?)"
+INSERT_REPLAY_SQL = "INSERT INTO replays (game_id, data) VALUES (?, ?)"
+
+GAME_REPLAY_SQL = """
+    SELECT games.player_name, games.score, replays.data
+    FROM games LEFT JOIN replays ON replays.game_id = games.id
+    WHERE games.id = ?
+"""
+
+
+def connect(path=DB_FILE, synchronous="NORMAL"):
+    # sqlite3 сам кеширует подготовленные запросы на соединение
+    # (cached_statements), поэтому SQL выше — неизменные строки.
+    conn = sqlite3.connect(path, cached_statements=64)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={synchronous}")
+    migrate(conn)
+    return conn
+
+
+def connect_readonly(path=DB_FILE):
+    # Для утилит, которые только смотрят в базу: без миграций и без
+    # переключения в WAL, запущенной игре не мешает.
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+def migrate(conn):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, migration in enumerate(MIGRATIONS, start=1):
+        if number <= version:
+            continue
+        with conn:
+            migration(conn.cursor())
+            conn.execute(f"PRAGMA user_version = {number}")
+
+
+def get_connection():
+    global _connection
+    if _connection is None:
+        # Не мигрируем параллельно с фоновой инициализацией
+        if _init_thread is not None:
+            _init_thread.join()
+        _connection = connect(_path)
+    return _connection
+
+
+def use_database(path):
+    # Другой файл базы для общего соединения и записи результатов
+    # (бенчмарки): текущие закрываются, новые откроются по требованию.
+    global _path
+    close()
+    _path = path
+
+
+def _init(path):
+    try:
+        connect(path).close()
+    except sqlite3.Error as e:
+        print("Ошибка инициализации базы:", e)
+
+
+def init_in_background(path=DB_FILE):
+    # Открытие базы и миграции при старте — в отдельном потоке, чтобы окно
+    # и меню не ждали диска. Соединение sqlite3 нельзя передать между
+    # потоками, поэтому основное открывается потом, уже без миграций.
+    global _init_thread
+    if _init_thread is None:
+        _init_thread = threading.Thread(target=_init, args=(path,), name="db-init", daemon=True)
+        _init_thread.start()
+    return _init_thread
+
+
+def is_ready():
+    return _init_thread is None or not _init_thread.is_alive()
+
+
+class ResultWriter:
+    # Запись результатов в отдельном потоке со своим соединением: поток
+    # отрисовки только кладёт строку в очередь. Всё, что накопилось в
+    # очереди, пишется одной транзакцией с одним fsync (synchronous=FULL),
+    # так что при падении теряется не больше того, что ещё не дошло до
+    # текущего коммита.
+    #
+    # Пока результат не закоммичен, он лежит и в pending: load_records и
+    # load_best_score добавляют его к прочитанному из базы, чтобы меню
+    # сразу после игры не показывало старый рекорд.
+    def __init__(self, path=DB_FILE, max_batch=WRITER_MAX_BATCH):
+        self.path = path
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, player_name, score, difficulty, skin, date_str, replay=None):
+        item = (player_name, score, difficulty, skin, date_str, replay)
+        # Та же форма, что у CURRENT_TIMESTAMP в games.timestamp
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+        with self.lock:
+            self.pending[id(item)] = (player_name, difficulty, score, timestamp)
+        self.queue.put(item)
+
+    def pending_results(self, player_name):
+        with self.lock:
+            return [
+                (difficulty, score, timestamp)
+                for name, difficulty, score, timestamp in self.pending.values()
+                if name == player_name
+            ]
+
+    def flush(self):
+        self.queue.join()
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def _run(self):
+        conn = connect(self.path, synchronous="FULL")
+        try:
+            running = True
+            while running:
+                batch = [self.queue.get()]
+                while len(batch) < self.max_batch:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                rows = [item for item in batch if item is not None]
+                running = len(rows) == len(batch)
+                try:
+                    if rows:
+                        self._write(conn, rows)
+                except sqlite3.Error as e:
+                    print("Ошибка записи результатов:", e)
+                finally:
+                    with self.lock:
+                        for item in rows:
+                            self.pending.pop(id(item), None)
+                    for _ in batch:
+                        self.queue.task_done()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _write(conn, rows):
+        with conn:
+            # id игры нужен для повтора, поэтому games — по одной строке
+            for name, score, diff, _, _, replay in rows:
+                game_id = conn.execute(INSERT_GAME_SQL, (name, score, diff)).lastrowid
+                if replay is not None:
+                    conn.execute(INSERT_REPLAY_SQL, (game_id, replay))
+            conn.executemany(INSERT_SETTINGS_SQL, [(name, diff, skin, date) for name, _, diff, skin, date, _ in rows])
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        _writer = ResultWriter(_path)
+    return _writer
+
+
+def flush_writes():
+    if _writer is not None:
+        _writer.flush()
+
+
+def close():
+    global _connection, _writer
+    if _writer is not None:
+        _writer.close()
+        _writer = None
+    if _connection is not None:
+        _connection.close()
+        _connection = None
+
+
+atexit.register(close)
+
+
+def pending_results(player_name):
+    # Снимок очереди берём до чтения из базы: результат, закоммиченный
+    # между двумя чтениями, попадёт хотя бы в одно из них.
+    if _writer is None:
+        return []
+    return _writer.pending_results(player_name)
+
+
+def load_best_score(player_name, difficulty):
+    pending = pending_results(player_name)
+    row = get_connection().execute(BEST_SCORE_SQL, (player_name, difficulty)).fetchone()
+    best = row[0] if row else None
+    for diff, score, _ in pending:
+        if diff == difficulty and (best is None or score > best):
+            best = score
+    return best
+
+
+def load_records(player_name, difficulties=DIFFICULTIES):
+    pending = pending_results(player_name)
+    records = {diff: None for diff in difficulties}
+    for diff, score, timestamp in get_connection().execute(RECORDS_SQL, (player_name,)):
+        if diff in records:
+            records[diff] = {
+                'score': score,
+                'date': timestamp
+            }
+    # При равном счёте рекорд — более поздняя игра, как и в триггере
+    for diff, score, timestamp in pending:
+        if diff in records and (records[diff] is None or score >= records[diff]['score']):
+            records[diff] = {
+                'score': score,
+                'date': timestamp
+            }
+    return records
+
+
+def save_game_result(player_name, score, difficulty, skin, date_str, replay=None):
+    get_writer().submit(player_name, score, difficulty, skin, date_str, replay)
+
@@ -0,0 +1,91 @@
+import time
+
+import arcade
+import pyglet
+
+from metrics import FRAME_PHASE, FRAME_BUDGET_MS, FRAME_HISTOGRAM_MS
+
+# Отладочный оверлей (F3 в игре): таблица p50 / p99 / max по фазам кадра
+# и гистограмма времени кадра. Текст пересобирается не чаще раза в
+# OVERLAY_REFRESH секунд, чтобы сам оверлей не давал заметной нагрузки.
+
+OVERLAY_REFRESH = 0.25
+OVERLAY_FONT = "Courier New"
+OVERLAY_FONT_SIZE = 14
+OVERLAY_LINE_HEIGHT = 20
+OVERLAY_WIDTH = 470
+HISTOGRAM_HEIGHT = 80
+HISTOGRAM_BAR_WIDTH = 46
+
+# Корзины не медленнее одного кадра на 60 Гц — зелёные, остальные красные
+FAST_BINS = sum(1 for edge in FRAME_HISTOGRAM_MS if edge <= FRAME_BUDGET_MS)
+
+
+class DebugOverlay:
+    def __init__(self, metrics, phases):
+        self.metrics = metrics
+        self.phases = list(phases) + [FRAME_PHASE]
+        self.visible = False
+        self.last_refresh = 0.0
+        self.counts = []
+
+        self.batch = pyglet.graphics.Batch()
+        self.header = self._text("фаза               p50     p99     max  мс")
+        self.lines = [self._text("") for _ in self.phases]
+        self.bin_labels = []
+
+    def _text(self, value, size=OVERLAY_FONT_SIZE, anchor_x="left"):
+        return arcade.Text(
+            value, 0, 0, arcade.color.WHITE, size,
+            font_name=OVERLAY_FONT, anchor_x=anchor_x, batch=self.batch
+        )
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.last_refresh = 0.0
+
+    def refresh(self):
+        stats = self.metrics.stats()
+        for text, name in zip(self.lines, self.phases):
+            values = stats.get(name)
+            if values is None:
+                text.text = f"{name:<16}      —"
+            else:
+                text.text = f"{name:<16}{values['p50']:7.2f} {values['p99']:7.2f} {values['max']:7.2f}"
+
+        histogram = self.metrics.histogram()
+        self.counts = [count for _, count in histogram]
+        if len(self.bin_labels) != len(histogram):
+            self.bin_labels = [self._text(label, 10, "center") for label, _ in histogram]
+
+    def draw(self, left, top):
+        if not self.visible:
+            return
+        now = time.perf_counter()
+        if now - self.last_refresh >= OVERLAY_REFRESH:
+            self.refresh()
+            self.last_refresh = now
+
+        rows = len(self.lines) + 1
+        height = rows * OVERLAY_LINE_HEIGHT + HISTOGRAM_HEIGHT + 50
+        arcade.draw_lbwh_rectangle_filled(left - 10, top - height, OVERLAY_WIDTH, height + 10, (0, 0, 0, 170))
+
+        # arcade.Text не двигается, если координаты те же — это дёшево
+        y = top - OVERLAY_LINE_HEIGHT
+        for text in [self.header] + self.lines:
+            text.x = left
+            text.y = y
+            y -= OVERLAY_LINE_HEIGHT
+
+        base = y - HISTOGRAM_HEIGHT
+        peak = max(self.counts) if self.counts and max(self.counts) > 0 else 1
+        for i, (count, label) in enumerate(zip(self.counts, self.bin_labels)):
+            x = left + i * (HISTOGRAM_BAR_WIDTH + 4)
+            bar = HISTOGRAM_HEIGHT * count / peak
+            color = arcade.color.GREEN if i < FAST_BINS else arcade.color.RED
+            if bar > 0:
+                arcade.draw_lbwh_rectangle_filled(x, base, HISTOGRAM_BAR_WIDTH, bar, color)
+            label.x = x + HISTOGRAM_BAR_WIDTH / 2
+            label.y = base - 16
+
+        self.batch.draw()
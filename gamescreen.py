@@ -1,28 +1,129 @@
 import arcade
-import random
-import json
-import sqlite3
+import pyglet
 import datetime
-
-BASE_GRAVITY = 0.4
-BASE_JUMP_POWER = 9
-BASE_PIPE_SPEED = 3.8
-BASE_PIPE_WIDTH = 90
-BASE_PIPE_INTERVAL = 1.9
-
-ANIMATION_SPEED = 0.12
-ANIMATION_FRAME_COUNT = 3
+import time
+from collections import deque
+
+from simulation import (
+    FlappySim,
+    BASE_PIPE_SPEED,
+    BASE_PIPE_WIDTH,
+    ANIMATION_FRAME_COUNT,
+    PHYSICS_DT,
+    PLAYER_X,
+    PLAYER_SCALE,
+    EVENT_SCORE,
+    EVENT_SPAWN,
+    EVENT_HIT,
+)
+from particles import ParticleSystem, PARTICLE_BUDGET
+from hitboxes import (
+    SKIN_FRAMES,
+    FALLBACK_TEXTURE,
+    DEFAULT_HIT_BOX_MODE,
+    load_hit_boxes,
+)
+from replay import ReplayRecorder
+from metrics import Metrics
+from debug_overlay import DebugOverlay
+import profiler
+import asset_cache
+import database
+import settings_store
 
 MAX_UP_ANGLE = 35
 MAX_DOWN_ANGLE = -70
-ANGLE_LERP_SPEED = 8.0
+
+# Физика считается в FlappySim шагами по PHYSICS_DT; за один кадр
+# догоняем не больше MAX_SUBSTEPS шагов.
+MAX_SUBSTEPS = 5
+
+HIT_BOX_MODE = DEFAULT_HIT_BOX_MODE
+
+# Фазы кадра в порядке строк отладочного оверлея
+METRIC_PHASES = (
+    "update_particles",
+    "physics",
+    "check_collisions",
+    "pipe_movement",
+    "spawn_pipe",
+    "save_game_result",
+    "draw_background",
+    "draw_pipes",
+    "draw_player",
+    "draw_particles",
+    "draw_hud",
+    "draw_game_over",
+)
+
+class PipePool:
+    # Пары спрайтов труб переиспользуются: пролетевшая пара прячется и
+    # потом перенастраивается под новый зазор, новые спрайты создаются
+    # только пока пул не разогрелся. Спрайты навсегда остаются в
+    # SpriteList, так что pop(0) и перестройка буферов больше не нужны.
+    def __init__(self, sprite_list, texture=None):
+        self.sprite_list = sprite_list
+        self.texture = texture
+        self.active = deque()
+        self.free = []
+
+        # Текстуру трубы кладём в атлас заранее: иначе загрузка на
+        # видеокарту случается на первой трубе, посреди игры.
+        if texture is not None:
+            sprite_list.preload_textures([texture])
+
+    def acquire(self, pipe):
+        if self.free:
+            pair = self.free.pop()
+        else:
+            if self.texture is not None:
+                pair = (arcade.Sprite(self.texture), arcade.Sprite(self.texture))
+            else:
+                pair = (arcade.Sprite(), arcade.Sprite())
+            for sprite in pair:
+                sprite.visible = False
+                self.sprite_list.append(sprite)
+            # Верхняя труба — та же текстура, перевёрнутая
+            pair[0].angle = 180
+
+        top_pipe, bottom_pipe = pair
+
+        bottom_height = pipe.bottom_height
+        top_height = pipe.top_height
+
+        bottom_pipe.width = BASE_PIPE_WIDTH
+        bottom_pipe.height = bottom_height
+        bottom_pipe.center_x = pipe.x
+        bottom_pipe.center_y = bottom_height / 2
+        bottom_pipe.visible = True
+
+        top_pipe.width = BASE_PIPE_WIDTH
+        top_pipe.height = top_height
+        top_pipe.center_x = pipe.x
+        top_pipe.center_y = pipe.height - top_height / 2
+        top_pipe.visible = True
+
+        self.active.append(pair)
+        return pair
+
+    def release_oldest(self):
+        pair = self.active.popleft()
+        for sprite in pair:
+            sprite.visible = False
+        self.free.append(pair)
+
+    def release_all(self):
+        while self.active:
+            self.release_oldest()
+
 
 class GameView(arcade.View):
     def __init__(self):
         super().__init__()
 
         self.load_settings()
-        arcade.set_background_color(arcade.color.SKY_BLUE)
+        self.settings_changed = False
+        settings_store.get_settings().subscribe(self.on_settings_changed)
 
         self.load_player_animation()
 
@@ -39,37 +140,56 @@ class GameView(arcade.View):
 
         self.pipe_texture = None
         try:
-            self.pipe_texture = arcade.load_texture("assets/pipe-green.png")
+            self.pipe_texture = asset_cache.get_texture(asset_cache.PIPE_TEXTURE)
         except Exception as e:
             print("Ошибка загрузки текстуры трубы:", e)
 
         try:
-            self.sound_wing = arcade.load_sound("assets/audio_wing.wav")
-            self.sound_point = arcade.load_sound("assets/audio_point.wav")
-            self.sound_hit = arcade.load_sound("assets/audio_hit.wav")
+            self.sound_wing = asset_cache.get_sound(asset_cache.SOUND_WING)
+            self.sound_point = asset_cache.get_sound(asset_cache.SOUND_POINT)
+            self.sound_hit = asset_cache.get_sound(asset_cache.SOUND_HIT)
         except Exception as e:
             print("Ошибка загрузки звуков:", e)
             self.sound_wing = None
             self.sound_point = None
             self.sound_hit = None
 
-        self.player = arcade.Sprite(scale=0.15)
-        self.player.center_x = 250
-        self.player.center_y = self.window.height // 2
-        self.player.velocity_y = 0
+        self.sim = FlappySim(
+            self.window.width,
+            self.window.height,
+            self.difficulty,
+            hit_boxes=self.player_hit_boxes()
+        )
+        self.accumulator = 0.0
+        self.flap_requested = False
+        self.recorder = ReplayRecorder(self.sim, self.skin, HIT_BOX_MODE)
+
+        # Замеры фаз кадра пишутся всегда (это несколько вызовов
+        # perf_counter за кадр); F3 показывает оверлей, F4 сохраняет в файл.
+        # check_collisions вызывается внутри sim.step, поэтому её меряем
+        # обёрткой на экземпляре симуляции.
+        self.metrics = Metrics()
+        self.sim.check_collisions = self.metrics.timed("check_collisions", self.sim.check_collisions)
+        self.debug_overlay = DebugOverlay(self.metrics, METRIC_PHASES)
+
+        self.player = arcade.Sprite(scale=PLAYER_SCALE)
+        self.player.center_x = PLAYER_X
+        self.player.center_y = self.sim.bird_y
         self.player.texture = self.animation_textures[0]
         self.player.angle = 0
 
         self.player_list = arcade.SpriteList()
         self.player_list.append(self.player)
 
-        self.current_frame = 0
-        self.animation_timer = 0.0
-
         self.pipe_list = arcade.SpriteList()
+        self.pipe_pool = PipePool(self.pipe_list, self.pipe_texture)
 
-        self.last_pipe_time = 0.0
-        self.last_update_time = 0.0
+        # Весь текст HUD собран заранее и рисуется двумя батчами: верхняя
+        # панель всегда, экран «игра окончена» — только после проигрыша.
+        # Раскладка глифов пересчитывается только при смене строки или
+        # позиции (сеттеры arcade.Text сами пропускают одинаковые значения).
+        self.hud_batch = pyglet.graphics.Batch()
+        self.game_over_batch = pyglet.graphics.Batch()
 
         self.score = 0
         self.score_text = arcade.Text(
@@ -80,7 +200,8 @@ class GameView(arcade.View):
             72,
             font_name="Kenney Future",
             anchor_x="center",
-            anchor_y="center"
+            anchor_y="center",
+            batch=self.hud_batch
         )
 
         self.player_name_text = arcade.Text(
@@ -91,24 +212,20 @@ class GameView(arcade.View):
             32,
             font_name="Arial",
             anchor_x="left",
-            anchor_y="center"
+            anchor_y="center",
+            batch=self.hud_batch
         )
 
-        difficulty_ru = {
-            "easy": "Легко",
-            "medium": "Средне",
-            "hard": "Сложно"
-        }.get(self.difficulty, self.difficulty.capitalize())
-
         self.difficulty_text = arcade.Text(
-            f"Сложность: {difficulty_ru}",
+            self.difficulty_label(),
             self.window.width - 40,
             self.window.height - 40,
             arcade.color.RED,
             24,
             font_name="Arial",
             anchor_x="right",
-            anchor_y="center"
+            anchor_y="center",
+            batch=self.hud_batch
         )
 
         self.best_score = self.load_best_score()
@@ -120,13 +237,15 @@ class GameView(arcade.View):
             28,
             font_name="Arial",
             anchor_x="right",
-            anchor_y="center"
+            anchor_y="center",
+            batch=self.hud_batch
         )
 
-        self.particles = []
+        self.particles = ParticleSystem(PARTICLE_BUDGET)
 
         self.game_started = False
         self.game_over = False
+        self.first_frame_started = None
 
         self.ready_text = arcade.Text(
             "Нажми ЛКМ или ПРОБЕЛ",
@@ -147,7 +266,8 @@ class GameView(arcade.View):
             60,
             font_name="Kenney Future",
             anchor_x="center",
-            anchor_y="center"
+            anchor_y="center",
+            batch=self.game_over_batch
         )
 
         self.final_score_text = arcade.Text(
@@ -158,123 +278,127 @@ class GameView(arcade.View):
             48,
             font_name="Arial",
             anchor_x="center",
-            anchor_y="center"
+            anchor_y="center",
+            batch=self.game_over_batch
+        )
+
+        self.restart_text = arcade.Text(
+            "ЛКМ — Перезапустить",
+            self.window.width // 2,
+            self.window.height // 2 - 60,
+            arcade.color.WHITE,
+            28,
+            anchor_x="center",
+            batch=self.game_over_batch
+        )
+
+        self.menu_hint_text = arcade.Text(
+            "ESC / ENTER — В меню",
+            self.window.width // 2,
+            self.window.height // 2 - 100,
+            arcade.color.WHITE,
+            28,
+            anchor_x="center",
+            batch=self.game_over_batch
         )
 
     def update_background_texture(self):
         try:
-            if self.easter_mode:
-                tex = arcade.load_texture("assets/easter_day.png")
-            else:
-                tex = arcade.load_texture("assets/background-day.png")
+            tex = asset_cache.get_texture(asset_cache.background_path(self.easter_mode, True))
             self.background_sprite.texture = tex
             self.current_background_is_day = True
         except Exception as e:
             print("Ошибка загрузки фона:", e)
 
     def load_player_animation(self):
-        if self.easter_mode:
-            try:
-                texture = arcade.load_texture("assets/easter_egg.png")
-                self.animation_textures = [texture] * ANIMATION_FRAME_COUNT
-            except:
-                fallback = arcade.load_texture(":resources:images/animated_characters/robot/robot_idle.png")
-                self.animation_textures = [fallback] * ANIMATION_FRAME_COUNT
-            return
-
-        base_names = {
-            "bird": "classic",
-            "plane": "plane",
-            "robot": "robot"
-        }
-        skin_base = base_names.get(self.skin, "robot")
-
-        self.animation_textures = []
-        success = True
-        for i in range(1, ANIMATION_FRAME_COUNT + 1):
-            try:
-                filename = f"assets/{skin_base}{i}.png"
-                texture = arcade.load_texture(filename)
-                self.animation_textures.append(texture)
-            except:
-                success = False
-                break
-
-        if not success or len(self.animation_textures) != ANIMATION_FRAME_COUNT:
-            fallback = arcade.load_texture(":resources:images/animated_characters/robot/robot_idle.png")
+        # Для пасхалки self.skin == "easter_egg", у неё свой набор кадров
+        paths = SKIN_FRAMES.get(self.skin, SKIN_FRAMES["robot"])
+        try:
+            self.animation_textures = [self.load_player_texture(path) for path in paths]
+            self.animation_paths = list(paths)
+        except Exception:
+            fallback = self.load_player_texture(FALLBACK_TEXTURE)
             self.animation_textures = [fallback] * ANIMATION_FRAME_COUNT
+            self.animation_paths = [FALLBACK_TEXTURE] * ANIMATION_FRAME_COUNT
 
-    def load_settings(self):
-        try:
-            with open("settings.txt", "r", encoding="utf-8") as f:
-                settings = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            settings = {
-                "difficulty": "medium",
-                "volume": 80,
-                "skin": "robot",
-                "player_name": "Игрок"
-            }
-
-        self.player_name = settings.get("player_name", "Игрок").strip()
-        self.easter_mode = (self.player_name.lower() == "дима петухов")
+    def load_player_texture(self, path):
+        return asset_cache.get_player_texture(path, HIT_BOX_MODE)
 
-        self.gravity = BASE_GRAVITY
+    def player_hit_boxes(self):
+        return load_hit_boxes(self.skin, PLAYER_SCALE, HIT_BOX_MODE, paths=self.animation_paths)
 
-        diff = settings.get("difficulty", "medium")
-        self.difficulty = diff
+    def load_settings(self):
+        settings = settings_store.get_settings()
 
-        if diff == "easy":
-            self.pipe_interval = 2.5
-            self.pipe_gap = 240
-        elif diff == "medium":
-            self.pipe_interval = BASE_PIPE_INTERVAL
-            self.pipe_gap = 220
-        else:
-            self.pipe_interval = 1.5
-            self.pipe_gap = 180
+        self.player_name = settings.player_name
+        self.easter_mode = (self.player_name.lower() == "дима петухов")
 
-        self.volume = settings.get("volume", 80)
+        self.difficulty = settings.difficulty
+
+        self.volume = settings.volume
 
         if not self.easter_mode:
-            self.skin = settings.get("skin", "robot")
+            self.skin = settings.skin
         else:
             self.skin = "easter_egg"
 
+    def on_settings_changed(self, name, value):
+        # Громкость применяется сразу; остальное — один раз при следующем
+        # reset(), а не на каждое нажатие клавиши в поле имени.
+        if name == "volume":
+            self.volume = value
+        else:
+            self.settings_changed = True
+
+    def apply_settings(self):
+        # Текстуры нового скина берутся из asset_cache без пересоздания экрана
+        if not self.settings_changed:
+            return
+        self.settings_changed = False
+        old_difficulty = self.difficulty
+        old_name = self.player_name
+        old_skin = self.skin
+        self.load_settings()
+
+        if self.skin != old_skin:
+            self.load_player_animation()
+            self.sim.set_hit_boxes(self.player_hit_boxes())
+        if self.difficulty != old_difficulty:
+            self.sim.set_difficulty(self.difficulty)
+            self.difficulty_text.text = self.difficulty_label()
+        if self.difficulty != old_difficulty or self.player_name != old_name:
+            self.best_score = self.load_best_score()
+
+    def difficulty_label(self):
+        difficulty_ru = {
+            "easy": "Легко",
+            "medium": "Средне",
+            "hard": "Сложно"
+        }.get(self.difficulty, self.difficulty.capitalize())
+        return f"Сложность: {difficulty_ru}"
+
     def load_best_score(self):
-        conn = sqlite3.connect("game.db")
-        c = conn.cursor()
-        c.execute("SELECT MAX(score) FROM games WHERE player_name = ? AND difficulty = ?",
-                  (self.player_name, self.difficulty))
-        result = c.fetchone()[0]
-        conn.close()
-        return result
+        return database.load_best_score(self.player_name, self.difficulty)
 
     def save_game_result(self):
-        conn = sqlite3.connect("game.db")
-        c = conn.cursor()
         date_str = datetime.datetime.now().isoformat()
-        c.execute("INSERT INTO games (player_name, score, difficulty) VALUES (?, ?, ?)",
-                  (self.player_name, self.score, self.difficulty))
-        c.execute("INSERT INTO settings_history (player_name, difficulty, skin, date) VALUES (?, ?, ?, ?)",
-                  (self.player_name, self.difficulty, self.skin, date_str))
-        conn.commit()
-        conn.close()
+        replay = self.recorder.finish().to_bytes()
+        database.save_game_result(self.player_name, self.score, self.difficulty, self.skin, date_str, replay)
+
+        # Запись в базу идёт в фоновом потоке, рекорд обновляем сразу в памяти
+        if self.best_score is None or self.score > self.best_score:
+            self.best_score = self.score
 
     def create_explosion(self):
         colors = [arcade.color.RED, arcade.color.ORANGE, arcade.color.YELLOW, arcade.color.WHITE]
-        for _ in range(60):
-            particle = {
-                'x': self.player.center_x,
-                'y': self.player.center_y,
-                'dx': random.uniform(-6, 6),
-                'dy': random.uniform(-6, 6),
-                'size': random.uniform(4, 12),
-                'color': random.choice(colors),
-                'alpha': 255,
-                'life': random.uniform(0.6, 1.2)
-            }
-            self.particles.append(particle)
+        self.particles.emit(
+            self.player.center_x, self.player.center_y, 60,
+            dx_range=(-6, 6),
+            dy_range=(-6, 6),
+            size_range=(4, 12),
+            life_range=(0.6, 1.2),
+            colors=colors
+        )
 
     def create_click_particles(self, x, y):
         colors = [
@@ -284,53 +408,43 @@ class GameView(arcade.View):
             arcade.color.LIGHT_GREEN,
             arcade.color.LIGHT_YELLOW
         ]
-        for _ in range(18):
-            particle = {
-                'x': x,
-                'y': y,
-                'dx': random.uniform(-3.5, 3.5),
-                'dy': random.uniform(5, 12),
-                'size': random.uniform(3, 9),
-                'color': random.choice(colors),
-                'alpha': 255,
-                'life': random.uniform(0.7, 1.4)
-            }
-            self.particles.append(particle)
+        self.particles.emit(
+            x, y, 18,
+            dx_range=(-3.5, 3.5),
+            dy_range=(5, 12),
+            size_range=(3, 9),
+            life_range=(0.7, 1.4),
+            colors=colors
+        )
 
     def update_particles(self, delta_time):
-        new_particles = []
-        for p in self.particles:
-            p['x'] += p['dx'] * 60 * delta_time
-            p['y'] += p['dy'] * 60 * delta_time
-            p['dy'] -= 18 * delta_time
-            p['life'] -= delta_time
-            p['alpha'] = int(255 * max(0, p['life'] / 1.4))
-            if p['life'] > 0:
-                new_particles.append(p)
-        self.particles = new_particles
+        self.particles.update(delta_time)
 
     def draw_particles(self):
-        for p in self.particles:
-            arcade.draw_circle_filled(
-                p['x'], p['y'],
-                p['size'],
-                (*p['color'][:3], p['alpha'])
-            )
-
-    def setup(self):
-        self.player.center_y = self.window.height // 2
-        self.player.velocity_y = 0
+        self.particles.draw()
+
+    def reset(self, measure=False):
+        # Один экземпляр на всё время работы: перезапуск и вход из меню
+        # только сбрасывают состояние, ничего не грузят с диска.
+        # measure=True — замерить путь от нажатия «Играть» до первого кадра.
+        self.first_frame_started = time.perf_counter() if measure else None
+        self.metrics.last_frame = None
+        self.apply_settings()
+
+        self.sim.width = self.window.width
+        self.sim.height = self.window.height
+        self.sim.reset()
+        self.recorder = ReplayRecorder(self.sim, self.skin, HIT_BOX_MODE)
+        self.accumulator = 0.0
+        self.flap_requested = False
+        self.player.center_y = self.sim.bird_y
         self.player.angle = 0
         self.score = 0
         self.score_text.text = "0"
         self.player_name_text.text = self.player_name
-        self.pipe_list.clear()
-        self.last_pipe_time = 0.0
-        self.last_update_time = 0.0
+        self.pipe_pool.release_all()
         self.game_started = False
         self.game_over = False
-        self.current_frame = 0
-        self.animation_timer = 0.0
         self.player.texture = self.animation_textures[0]
         self.player.visible = True
 
@@ -342,14 +456,21 @@ class GameView(arcade.View):
 
         self.player_name_text.y = self.window.height - 60
 
-        self.best_score = self.load_best_score()
         self.best_score_text.text = f"Рекорд: {self.best_score}" if self.best_score is not None else ""
 
-        self.particles = []
+        self.particles.clear()
+
+    def on_show_view(self):
+        # Экран собирается заранее, пока на экране меню, поэтому цвет фона
+        # окна меняем только при показе
+        arcade.set_background_color(arcade.color.SKY_BLUE)
 
     def on_resize(self, width: int, height: int):
         super().on_resize(width, height)
 
+        self.sim.width = width
+        self.sim.height = height
+
         self.background_sprite.width = width
         self.background_sprite.height = height
         self.background_sprite.center_x = width / 2
@@ -367,6 +488,12 @@ class GameView(arcade.View):
         self.final_score_text.x = width // 2
         self.final_score_text.y = height // 2
 
+        self.restart_text.x = width // 2
+        self.restart_text.y = height // 2 - 60
+
+        self.menu_hint_text.x = width // 2
+        self.menu_hint_text.y = height // 2 - 100
+
         self.player_name_text.y = height - 60
 
         self.difficulty_text.x = width - 40
@@ -376,133 +503,107 @@ class GameView(arcade.View):
         self.best_score_text.y = height - 75
 
     def on_update(self, delta_time: float):
-        self.update_particles(delta_time)
+        if profiler.is_running():
+            profiler.sample_tags()
 
-        if not self.game_started or self.game_over:
-            return
+        with self.metrics.phase("update_particles"):
+            self.update_particles(delta_time)
 
-        self.player.velocity_y -= self.gravity
-        self.player.center_y += self.player.velocity_y
-
-        if self.player.velocity_y > 0:
-            target_angle = -35
-        else:
-            fall_factor = min(1.0, abs(self.player.velocity_y) / 12.0)
-            target_angle = 70 * fall_factor
-
-        self.player.angle += (target_angle - self.player.angle) * ANGLE_LERP_SPEED * delta_time
-        self.player.angle = max(-90, min(45, self.player.angle))
-
-        if self.player.top < 0 or self.player.bottom > self.window.height:
-            self.game_over = True
-            self.final_score_text.text = f"Счёт: {self.score}"
-            if self.sound_hit:
-                arcade.play_sound(self.sound_hit, volume=self.volume / 100)
-            self.create_explosion()
-            self.player.visible = False
-            self.save_game_result()
+        if not self.game_started or self.game_over:
             return
 
-        for pipe in self.pipe_list:
-            pipe.center_x -= BASE_PIPE_SPEED
-
-        while len(self.pipe_list) >= 2 and self.pipe_list[0].right < 0:
-            self.pipe_list.pop(0)
-            self.pipe_list.pop(0)
-            self.score += 1
-            self.score_text.text = str(self.score)
-            if self.sound_point:
-                arcade.play_sound(self.sound_point, volume=self.volume / 100)
-
-            if self.score % 10 == 0 and self.score > 0:
-                if self.current_background_is_day:
-                    self.current_background_is_day = False
-                    try:
-                        if self.easter_mode:
-                            tex = arcade.load_texture("assets/easter_night.png")
-                        else:
-                            tex = arcade.load_texture("assets/background-night.png")
-                        self.background_sprite.texture = tex
-                    except Exception as e:
-                        print("Ошибка смены ночного фона:", e)
-                else:
-                    self.current_background_is_day = True
-                    self.update_background_texture()
-
-        self.last_update_time += delta_time
-        if self.last_update_time - self.last_pipe_time > self.pipe_interval:
-            self.spawn_pipe()
-            self.last_pipe_time = self.last_update_time
-
-        self.animation_timer += delta_time
-        if self.animation_timer >= ANIMATION_SPEED:
-            self.animation_timer -= ANIMATION_SPEED
-            self.current_frame = (self.current_frame + 1) % ANIMATION_FRAME_COUNT
-            self.player.texture = self.animation_textures[self.current_frame]
-
-        self.check_collisions()
-
-    def spawn_pipe(self):
-        min_y = 140
-        max_y = self.window.height - 140 - self.pipe_gap
-
-        if self.difficulty == "hard" and hasattr(self, 'last_gap_y'):
-            half = self.window.height // 2
-            prev = self.last_gap_y
-
-            if prev < half:
-                min_y = 140
-                max_y = half - self.pipe_gap // 2
+        # Накопитель времени: делаем столько фиксированных шагов, сколько
+        # набежало с прошлого кадра, но не больше MAX_SUBSTEPS, чтобы после
+        # долгого фриза игра не пыталась догнать всё разом.
+        self.accumulator += delta_time
+        steps = 0
+        while self.accumulator >= PHYSICS_DT and steps < MAX_SUBSTEPS:
+            if self.flap_requested:
+                self.recorder.flap(self.sim.steps)
+            with self.metrics.phase("physics"):
+                events = self.sim.step(self.flap_requested)
+            self.flap_requested = False
+            self.accumulator -= PHYSICS_DT
+            steps += 1
+            self.handle_events(events)
+            if self.game_over:
+                self.accumulator = 0.0
+                return
+
+        if self.accumulator >= PHYSICS_DT:
+            self.accumulator = self.accumulator % PHYSICS_DT
+
+        self.player.texture = self.animation_textures[self.sim.frame]
+        with self.metrics.phase("pipe_movement"):
+            self.interpolate(self.accumulator / PHYSICS_DT)
+
+    def handle_events(self, events):
+        for event in events:
+            if event == EVENT_SCORE:
+                self.on_pipe_passed()
+            elif event == EVENT_SPAWN:
+                self.spawn_pipe(self.sim.pipes[-1])
+            elif event == EVENT_HIT:
+                self.on_player_hit()
+
+    def on_pipe_passed(self):
+        self.pipe_pool.release_oldest()
+        self.score = self.sim.score
+        self.score_text.text = str(self.score)
+        if self.sound_point:
+            arcade.play_sound(self.sound_point, volume=self.volume / 100)
+
+        if self.score % 10 == 0 and self.score > 0:
+            if self.current_background_is_day:
+                self.current_background_is_day = False
+                try:
+                    tex = asset_cache.get_texture(asset_cache.background_path(self.easter_mode, False))
+                    self.background_sprite.texture = tex
+                except Exception as e:
+                    print("Ошибка смены ночного фона:", e)
             else:
-                min_y = half + self.pipe_gap // 2
-                max_y = self.window.height - 140 - self.pipe_gap
-
-            if min_y >= max_y:
-                min_y = 140
-                max_y = self.window.height - 140 - self.pipe_gap
-
-        gap_y = random.randint(min_y, max_y)
-
-        bottom_height = gap_y
-        top_height = self.window.height - (gap_y + self.pipe_gap)
-
-        bottom_pipe = arcade.Sprite()
-        if self.pipe_texture:
-            bottom_pipe.texture = self.pipe_texture
-        bottom_pipe.width = BASE_PIPE_WIDTH
-        bottom_pipe.height = bottom_height
-        bottom_pipe.center_x = self.window.width + 200
-        bottom_pipe.bottom = 0
-        bottom_pipe.center_y = bottom_height / 2
+                self.current_background_is_day = True
+                self.update_background_texture()
+
+    def on_player_hit(self):
+        self.game_over = True
+        self.player.center_y = self.sim.bird_y
+        self.final_score_text.text = f"Счёт: {self.score}"
+        if self.sound_hit:
+            arcade.play_sound(self.sound_hit, volume=self.volume / 100)
+        self.create_explosion()
+        self.player.visible = False
+        with self.metrics.phase("save_game_result"):
+            self.save_game_result()
 
-        top_pipe = arcade.Sprite()
-        if self.pipe_texture:
-            top_pipe.texture = self.pipe_texture
-            top_pipe.angle = 180
-        top_pipe.width = BASE_PIPE_WIDTH
-        top_pipe.height = top_height
-        top_pipe.center_x = self.window.width + 200
-        top_pipe.top = self.window.height
-        top_pipe.center_y = self.window.height - top_height / 2
-
-        self.pipe_list.append(top_pipe)
-        self.pipe_list.append(bottom_pipe)
-
-        self.last_gap_y = gap_y
-
-    def check_collisions(self):
-        for pipe in self.pipe_list:
-            if arcade.check_for_collision(self.player, pipe):
-                self.game_over = True
-                self.final_score_text.text = f"Счёт: {self.score}"
-                if self.sound_hit:
-                    arcade.play_sound(self.sound_hit, volume=self.volume / 100)
-                self.create_explosion()
-                self.player.visible = False
-                self.save_game_result()
-                break
+    def interpolate(self, alpha):
+        # Рисуем состояние между двумя последними шагами физики, иначе
+        # на 144 Гц птица и трубы двигались бы рывками.
+        sim = self.sim
+        self.player.center_y = sim.prev_bird_y + (sim.bird_y - sim.prev_bird_y) * alpha
+        self.player.angle = sim.bird_angle
+        offset = BASE_PIPE_SPEED * (1.0 - alpha)
+        for pipe, (top_pipe, bottom_pipe) in zip(sim.pipes, self.pipe_pool.active):
+            x = pipe.x + offset
+            top_pipe.center_x = x
+            bottom_pipe.center_x = x
+
+    def spawn_pipe(self, pipe):
+        with self.metrics.phase("spawn_pipe"):
+            self.pipe_pool.acquire(pipe)
 
     def on_key_press(self, symbol: int, modifiers: int):
+        if symbol == arcade.key.F3:
+            self.debug_overlay.toggle()
+            return
+        if symbol == arcade.key.F4:
+            self.export_metrics()
+            return
+        if symbol == arcade.key.F5:
+            seconds = getattr(self.window, "profile_seconds", profiler.DEFAULT_PROFILE_SECONDS)
+            profiler.start_capture(seconds, self.profile_tags, arcade.schedule_once)
+            return
+
         if self.game_over:
             if symbol in (arcade.key.ESCAPE, arcade.key.ENTER, arcade.key.RETURN):
                 self.window.show_view(self.window.menu_view)
@@ -513,14 +614,14 @@ class GameView(arcade.View):
             return
 
         if symbol in (arcade.key.SPACE, arcade.key.UP):
-            self.player.velocity_y = BASE_JUMP_POWER
+            self.flap_requested = True
             if self.sound_wing:
                 arcade.play_sound(self.sound_wing, volume=self.volume / 100)
 
     def on_mouse_press(self, x: float, y: float, button: int, modifiers: int):
         if self.game_over:
             if button == arcade.MOUSE_BUTTON_LEFT:
-                self.setup()
+                self.reset()
             return
 
         if not self.game_started:
@@ -528,47 +629,63 @@ class GameView(arcade.View):
             return
 
         if button == arcade.MOUSE_BUTTON_LEFT:
-            self.player.velocity_y = BASE_JUMP_POWER
+            self.flap_requested = True
             if self.sound_wing:
                 arcade.play_sound(self.sound_wing, volume=self.volume / 100)
             self.create_click_particles(x, y)
 
+    def profile_tags(self):
+        return {
+            "difficulty": self.difficulty,
+            "skin": self.skin,
+            "particles": len(self.particles),
+        }
+
+    def export_metrics(self):
+        try:
+            path = self.metrics.export(extra=self.profile_tags())
+            print("Замеры кадра сохранены в", path)
+        except OSError as e:
+            print("Ошибка сохранения замеров:", e)
+
     def on_draw(self):
+        # Время отрисовки — это время подготовки и отправки команд на
+        # стороне CPU; сама видеокарта работает асинхронно.
+        metrics = self.metrics
+        metrics.frame()
         self.clear()
 
-        self.background_list.draw()
+        with metrics.phase("draw_background"):
+            self.background_list.draw()
 
         if self.game_started and not self.game_over:
-            self.pipe_list.draw()
+            with metrics.phase("draw_pipes"):
+                self.pipe_list.draw()
 
-        self.player_list.draw()
+        with metrics.phase("draw_player"):
+            self.player_list.draw()
 
-        self.draw_particles()
+        with metrics.phase("draw_particles"):
+            self.draw_particles()
 
-        self.score_text.draw()
-        self.player_name_text.draw()
-        self.difficulty_text.draw()
-        self.best_score_text.draw()
+        with metrics.phase("draw_hud"):
+            self.hud_batch.draw()
 
-        if not self.game_started:
-            self.ready_text.draw()
+            if not self.game_started:
+                self.ready_text.draw()
 
         if self.game_over:
-            arcade.draw_lbwh_rectangle_filled(
-                0, 0,
-                self.window.width, self.window.height,
-                (0, 0, 0, 140)
-            )
-            self.game_over_text.draw()
-            self.final_score_text.draw()
-
-            arcade.draw_text(
-                "ЛКМ — Перезапустить",
-                self.window.width // 2, self.window.height // 2 - 60,
-                arcade.color.WHITE, 28, anchor_x="center"
-            )
-            arcade.draw_text(
-                "ESC / ENTER — В меню",
-                self.window.width // 2, self.window.height // 2 - 100,
-                arcade.color.WHITE, 28, anchor_x="center"
-            )
+            with metrics.phase("draw_game_over"):
+                arcade.draw_lbwh_rectangle_filled(
+                    0, 0,
+                    self.window.width, self.window.height,
+                    (0, 0, 0, 140)
+                )
+                self.game_over_batch.draw()
+
+        self.debug_overlay.draw(20, self.window.height - 110)
+
+        # Не в METRIC_PHASES: в оверлей не выводится, но попадает в экспорт (F4)
+        if self.first_frame_started is not None:
+            self.metrics.add("menu_to_first_frame", time.perf_counter() - self.first_frame_started)
+            self.first_frame_started = None
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import threading
+
+from simulation import PLAYER_SCALE, ANIMATION_FRAME_COUNT
+
+# Хитбоксы кадров персонажа считаются один раз и хранятся на диске по
+# хешу файла, масштабу и режиму. Загрузка кеша не требует arcade, так что
+# им пользуются и FlappySim без окна, и проверка реплеев.
+#
+# hitbox_cache.json не хранится в git (в нём есть запись для текстуры из
+# ресурсов arcade, она зависит от версии): он создаётся при первом
+# запуске игры или заранее — python hitboxes.py.
+
+HITBOX_CACHE_FILE = "hitbox_cache.json"
+
+# simple   — алгоритм arcade по умолчанию (то, что было в игре раньше)
+# detailed — подробный контур arcade (pymunk), много точек, медленно
+# hull     — выпуклая оболочка simple: для SAT это корректная фигура
+# hull6    — оболочка, упрощённая до 6 вершин
+# box      — ограничивающий прямоугольник
+HIT_BOX_MODES = ("simple", "detailed", "hull", "hull6", "box")
+DEFAULT_HIT_BOX_MODE = "simple"
+
+FALLBACK_TEXTURE = ":resources:images/animated_characters/robot/robot_idle.png"
+
+SKIN_FRAMES = {
+    "robot": [f"assets/robot{i}.png" for i in range(1, ANIMATION_FRAME_COUNT + 1)],
+    "bird": [f"assets/classic{i}.png" for i in range(1, ANIMATION_FRAME_COUNT + 1)],
+    "plane": [f"assets/plane{i}.png" for i in range(1, ANIMATION_FRAME_COUNT + 1)],
+    "easter_egg": ["assets/easter_egg.png"] * ANIMATION_FRAME_COUNT,
+}
+
+_cache = None
+_dirty = False
+_digests = {}
+# Кеш наполняют и поток предзагрузки (asset_cache), и главный поток
+_lock = threading.RLock()
+
+
+def resolve_path(path):
+    if path.startswith(":resources:"):
+        import arcade
+        return str(arcade.resources.resolve(path))
+    return path
+
+
+def file_digest(path):
+    path = resolve_path(path)
+    stat = os.stat(path)
+    memo_key = (path, stat.st_mtime_ns, stat.st_size)
+    digest = _digests.get(memo_key)
+    if digest is None:
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        _digests[memo_key] = digest
+    return digest
+
+
+def cache_key(digest, scale, mode):
+    return f"{digest}:{scale:g}:{mode}"
+
+
+def load_cache(path=HITBOX_CACHE_FILE):
+    global _cache
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        cache = {}
+    with _lock:
+        _cache = cache
+    return _cache
+
+
+def save_cache(path=HITBOX_CACHE_FILE):
+    global _dirty
+    # Сохраняет один поток за раз: второй подождёт и запишет уже полный кеш
+    with _lock:
+        if _cache is None:
+            return
+        data = json.dumps(_cache, sort_keys=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        _dirty = False
+
+
+def convex_hull(points):
+    points = sorted(set((float(x), float(y)) for x, y in points))
+    if len(points) <= 2:
+        return points
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower = []
+    for p in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    upper = []
+    for p in reversed(points):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return lower[:-1] + upper[:-1]
+
+
+def simplify_hull(hull, max_points):
+    # Выкидываем вершину, которая отрезает самый маленький треугольник,
+    # пока не останется max_points. Оболочка остаётся выпуклой.
+    hull = list(hull)
+    while len(hull) > max_points:
+        count = len(hull)
+        smallest = None
+        for i in range(count):
+            (ax, ay), (bx, by), (cx, cy) = hull[i - 1], hull[i], hull[(i + 1) % count]
+            area = abs((bx - ax) * (cy - ay) - (by - ay) * (cx - ax))
+            if smallest is None or area < smallest[0]:
+                smallest = (area, i)
+        hull.pop(smallest[1])
+    return hull
+
+
+def bounding_box(points):
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return [(min(xs), min(ys)), (max(xs), min(ys)), (max(xs), max(ys)), (min(xs), max(ys))]
+
+
+def compute_hit_box(path, mode=DEFAULT_HIT_BOX_MODE):
+    # Точки в координатах текстуры (без масштаба), как их считает arcade
+    from arcade import hitbox
+    from PIL import Image
+
+    image = Image.open(resolve_path(path)).convert("RGBA")
+    if mode == "detailed":
+        return [tuple(p) for p in hitbox.algo_detailed.calculate(image)]
+
+    points = [tuple(p) for p in hitbox.algo_simple.calculate(image)]
+    if mode == "simple":
+        return points
+    if mode == "hull":
+        return convex_hull(points)
+    if mode == "hull6":
+        return simplify_hull(convex_hull(points), 6)
+    if mode == "box":
+        return bounding_box(points)
+    raise ValueError(f"Неизвестный режим хитбокса: {mode}")
+
+
+def get_hit_box(path, scale=PLAYER_SCALE, mode=DEFAULT_HIT_BOX_MODE):
+    global _dirty
+    with _lock:
+        if _cache is None:
+            load_cache()
+        key = cache_key(file_digest(path), scale, mode)
+        points = _cache.get(key)
+    if points is None:
+        # Контур считаем без блокировки: это долго, а посчитать один кадр
+        # дважды из двух потоков не страшно — результат одинаковый
+        points = [[x * scale, y * scale] for x, y in compute_hit_box(path, mode)]
+        with _lock:
+            _cache[key] = points
+            _dirty = True
+    return tuple((x, y) for x, y in points)
+
+
+def load_hit_boxes(skin, scale=PLAYER_SCALE, mode=DEFAULT_HIT_BOX_MODE, paths=None):
+    if paths is None:
+        paths = SKIN_FRAMES.get(skin, SKIN_FRAMES["robot"])
+    boxes = [get_hit_box(path, scale, mode) for path in paths]
+    with _lock:
+        dirty = _dirty
+    if dirty:
+        try:
+            save_cache()
+        except OSError as e:
+            print("Ошибка сохранения кеша хитбоксов:", e)
+    return boxes
+
+
+def warm_cache(scale=PLAYER_SCALE, modes=HIT_BOX_MODES):
+    for mode in modes:
+        for skin in SKIN_FRAMES:
+            load_hit_boxes(skin, scale, mode)
+        load_hit_boxes(None, scale, mode, paths=[FALLBACK_TEXTURE])
+
+
+if __name__ == "__main__":
+    warm_cache()
+    print(f"Кеш хитбоксов записан в {HITBOX_CACHE_FILE}: {len(_cache)} записей")
@@ -0,0 +1,74 @@
+import random
+from functools import lru_cache
+
+# Трасса целиком задаётся сидом: зазоры труб генерируются заранее
+# кусками и кешируются по (seed, difficulty, height), так что одинаковый
+# сид всегда даёт одинаковую трассу, а спавн трубы — просто индекс в списке.
+
+BASE_PIPE_INTERVAL = 1.9
+PIPE_MARGIN = 140
+SCHEDULE_CHUNK = 64
+
+DIFFICULTY_PARAMS = {
+    "easy": {"pipe_interval": 2.5, "pipe_gap": 240},
+    "medium": {"pipe_interval": BASE_PIPE_INTERVAL, "pipe_gap": 220},
+    "hard": {"pipe_interval": 1.5, "pipe_gap": 180},
+}
+
+
+def difficulty_params(difficulty):
+    return DIFFICULTY_PARAMS.get(difficulty, DIFFICULTY_PARAMS["hard"])
+
+
+def next_gap_y(rng, difficulty, height, pipe_gap, last_gap_y):
+    min_y = PIPE_MARGIN
+    max_y = height - PIPE_MARGIN - pipe_gap
+
+    # На сложном уровне зазор прыгает между верхней и нижней половиной экрана
+    if difficulty == "hard" and last_gap_y is not None:
+        half = height // 2
+        if last_gap_y < half:
+            min_y = PIPE_MARGIN
+            max_y = half - pipe_gap // 2
+        else:
+            min_y = half + pipe_gap // 2
+            max_y = height - PIPE_MARGIN - pipe_gap
+
+        if min_y >= max_y:
+            min_y = PIPE_MARGIN
+            max_y = height - PIPE_MARGIN - pipe_gap
+
+    return rng.randint(min_y, max_y)
+
+
+class GapSchedule:
+    def __init__(self, seed, difficulty, height):
+        self.seed = seed
+        self.difficulty = difficulty
+        self.height = height
+        self.pipe_gap = difficulty_params(difficulty)["pipe_gap"]
+        self.rng = random.Random(seed)
+        self.gaps = []
+
+    def extend(self, count=SCHEDULE_CHUNK):
+        last_gap_y = self.gaps[-1] if self.gaps else None
+        for _ in range(count):
+            last_gap_y = next_gap_y(self.rng, self.difficulty, self.height, self.pipe_gap, last_gap_y)
+            self.gaps.append(last_gap_y)
+
+    def gap(self, index):
+        while index >= len(self.gaps):
+            self.extend()
+        return self.gaps[index]
+
+    def __getitem__(self, index):
+        return self.gap(index)
+
+
+@lru_cache(maxsize=128)
+def get_schedule(seed, difficulty, height):
+    return GapSchedule(seed, difficulty, height)
+
+
+def random_seed():
+    return random.randrange(2 ** 32)
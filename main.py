@@ -1,58 +1,127 @@
-import arcade
-from mainmenu import MenuView
-from gamescreen import GameView
-import sqlite3
-
-
-def init_database():
-    conn = sqlite3.connect("game.db")
-    c = conn.cursor()
-
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS games (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            player_name TEXT NOT NULL,
-            score INTEGER NOT NULL,
-            difficulty TEXT DEFAULT 'medium',          -- ← добавлен
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS settings_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            player_name TEXT NOT NULL,
-            difficulty TEXT NOT NULL,
-            skin TEXT NOT NULL,
-            date TEXT NOT NULL
-        )
-    ''')
+import argparse
+import sys
+
+import startup
 
-    conn.commit()
-    conn.close()
+# Трассировку импортов включаем до тяжёлых импортов, а не в main()
+if "--startup-report" in sys.argv:
+    startup.trace_imports()
 
+with startup.phase("import arcade"):
+    import arcade
+import database
+import profiler
+import settings_store
 
-# Вызови один раз при запуске
-init_database()
 SCREEN_TITLE = "Flappy Bird"
 
+# Порядок старта: база открывается и мигрирует в фоновом потоке
+# параллельно с созданием окна, окно и меню — как можно раньше, всё
+# остальное — после первого кадра меню, по одному шагу за кадр:
+#   1. кеш хитбоксов и фоновая предзагрузка текстур и звуков;
+#   2. когда предзагрузка закончилась — один экземпляр GameView.
+# gamescreen (и NumPy за ним) импортируется только на шаге 2 или при
+# первом нажатии «Играть», если оно случилось раньше.
+
+
+class StartupPipeline:
+    def __init__(self, window, show_report=False, quit_after=False):
+        self.window = window
+        self.show_report = show_report
+        self.quit_after = quit_after
+        self.steps = [self.start_preload, self.build_game_view]
+        self.preload_thread = None
+
+    def start(self):
+        # Зовётся из первого MenuView.on_draw; шаги идут со следующего тика,
+        # уже после того как кадр меню показан
+        startup.mark("first frame")
+        arcade.schedule_once(self.run_next, 0)
+
+    def run_next(self, delta_time):
+        step = self.steps[0]
+        if step() is not False:
+            self.steps.pop(0)
+        if self.steps:
+            arcade.schedule_once(self.run_next, 0)
+        else:
+            self.finish()
+
+    def start_preload(self):
+        import hitboxes
+        import asset_cache
+        with startup.phase("hitbox cache"):
+            hitboxes.load_cache()
+        self.preload_thread = asset_cache.preload_in_background()
+
+    def build_game_view(self):
+        # Ждём предзагрузку, иначе GameView грузил бы текстуры сам в кадре
+        if self.preload_thread is not None and self.preload_thread.is_alive():
+            return False
+        startup.mark("assets preloaded")
+        if getattr(self.window, "game_view", None) is None:
+            with startup.phase("import gamescreen"):
+                from gamescreen import GameView
+            with startup.phase("GameView()"):
+                self.window.game_view = GameView()
+
+    def finish(self):
+        if not database.is_ready():
+            arcade.schedule_once(lambda delta_time: self.finish(), 0.05)
+            return
+        startup.mark("database ready")
+        if self.show_report:
+            startup.stop_tracing_imports()
+            startup.report()
+        if self.quit_after:
+            arcade.exit()
+
+
+def profile_tags(window):
+    game_view = getattr(window, "game_view", None)
+    if game_view is not None:
+        return game_view.profile_tags()
+    settings = settings_store.get_settings()
+    return {"difficulty": settings.difficulty, "skin": settings.skin, "particles": 0}
+
+
 def main():
-    window = arcade.Window(
-        title=SCREEN_TITLE,
-        fullscreen=True,
-        resizable=False,
-        visible=True
-    )
+    parser = argparse.ArgumentParser(description=SCREEN_TITLE)
+    parser.add_argument("--startup-report", action="store_true",
+                        help="вывести время этапов старта и импортов в stderr")
+    parser.add_argument("--profile", type=float, metavar="N",
+                        help="профилировать первые N секунд работы (F5 в игре — столько же)")
+    parser.add_argument("--quit-after-startup", action="store_true",
+                        help="выйти, как только старт закончен (для benchmarks/suite.py)")
+    args = parser.parse_args()
+
+    database.init_in_background()
+
+    with startup.phase("window"):
+        window = arcade.Window(
+            title=SCREEN_TITLE,
+            fullscreen=True,
+            resizable=False,
+            visible=True
+        )
 
     SCREEN_WIDTH = window.width
     SCREEN_HEIGHT = window.height
 
-    menu_view = MenuView()
-    game_view = GameView()
+    with startup.phase("import mainmenu"):
+        from mainmenu import MenuView
+    with startup.phase("MenuView()"):
+        menu_view = MenuView()
 
     window.menu_view = menu_view
+    window.game_view = None
+
+    window.profile_seconds = args.profile or profiler.DEFAULT_PROFILE_SECONDS
 
     window.show_view(menu_view)
+    menu_view.after_first_frame = StartupPipeline(window, args.startup_report, args.quit_after_startup).start
+    if args.profile:
+        profiler.start_capture(args.profile, lambda: profile_tags(window), arcade.schedule_once)
     arcade.run()
 
 if __name__ == "__main__":
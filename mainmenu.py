@@ -1,10 +1,8 @@
 import arcade
 import arcade.gui
-from gamescreen import GameView
-from settings import SettingsView
 from styles import BUTTON_STYLE, DIALOG_YES_STYLE, DIALOG_NO_STYLE
-import json
-import sqlite3
+import database
+import settings_store
 from datetime import datetime
 
 SCREEN_TITLE = "Главное меню"
@@ -57,6 +55,18 @@ class MenuView(arcade.View):
         self.overlay = None
 
         self.player_name = self.load_player_name()
+        settings_store.get_settings().subscribe(self.on_player_name_changed, "player_name")
+
+        # Заголовок раскладывается один раз, а не в каждом on_draw
+        self.title_text = arcade.Text(
+            SCREEN_TITLE,
+            self.window.width // 2,
+            self.window.height - 120,
+            arcade.color.WHITE,
+            font_size=52,
+            anchor_x="center",
+            font_name="Kenney Future"
+        )
 
         self.name_text = arcade.Text(
             self.player_name,
@@ -69,22 +79,18 @@ class MenuView(arcade.View):
             anchor_y="bottom"
         )
 
-        # Загружаем рекорды + даты
-        self.records = self.load_records_with_dates()
+        # main.py вешает сюда продолжение старта: вызывается один раз, в
+        # конце первого on_draw — когда меню уже нарисовано
+        self.after_first_frame = None
+
+        # Рекорды + даты подставляются в on_show_view, когда база готова
+        self.records = {}
         self.record_texts = []
 
         y_offset = self.window.height - 200
-        for diff_ru, data in [("Легко", self.records.get("easy")),
-                              ("Средне", self.records.get("medium")),
-                              ("Сложно", self.records.get("hard"))]:
-            if data and data['score'] is not None:
-                date_str = datetime.fromisoformat(data['date']).strftime("%d.%m.%Y")
-                text = f"{diff_ru}: {data['score']}  ({date_str})"
-            else:
-                text = f"{diff_ru}: —"
-
+        for diff_ru in ["Легко", "Средне", "Сложно"]:
             t = arcade.Text(
-                text,
+                f"{diff_ru}: —",
                 x=self.window.width // 2,
                 y=y_offset,
                 color=arcade.color.YELLOW,
@@ -97,48 +103,30 @@ class MenuView(arcade.View):
             y_offset -= 50
 
     def load_player_name(self):
-        try:
-            with open("settings.txt", "r", encoding="utf-8") as f:
-                settings = json.load(f)
-                return settings.get("player_name", "Игрок")
-        except (FileNotFoundError, json.JSONDecodeError):
-            return "Игрок"
+        return settings_store.get_settings().player_name
 
-    def load_records_with_dates(self):
-        records = {}
-        conn = sqlite3.connect("game.db")
-        c = conn.cursor()
-
-        for diff in ["easy", "medium", "hard"]:
-            c.execute("""
-                SELECT score, timestamp
-                FROM games 
-                WHERE player_name = ? 
-                  AND difficulty = ?
-                  AND score = (SELECT MAX(score) FROM games 
-                               WHERE player_name = ? AND difficulty = ?)
-                ORDER BY timestamp DESC
-                LIMIT 1
-            """, (self.player_name, diff, self.player_name, diff))
-
-            row = c.fetchone()
-            if row:
-                records[diff] = {
-                    'score': row[0],
-                    'date': row[1]
-                }
-            else:
-                records[diff] = None
+    def on_player_name_changed(self, name, value):
+        self.player_name = value
+        self.name_text.text = value
 
-        conn.close()
-        return records
+    def load_records_with_dates(self):
+        return database.load_records(self.player_name)
 
     def on_click_play(self, event):
-        game_view = GameView()
-        game_view.setup()
+        # Обычно экран игры уже собран в фоне после старта (main.py)
+        if getattr(self.window, "game_view", None) is None:
+            # «Играть» нажали раньше, чем закончилась предзагрузка: ждём её,
+            # а не грузим те же текстуры и хитбоксы второй раз параллельно
+            import asset_cache
+            asset_cache.wait_for_preload()
+            from gamescreen import GameView
+            self.window.game_view = GameView()
+        game_view = self.window.game_view
+        game_view.reset(measure=True)
         self.window.show_view(game_view)
 
     def on_click_settings(self, event):
+        from settings import SettingsView
         settings_view = SettingsView()
         self.window.show_view(settings_view)
 
@@ -229,9 +217,17 @@ class MenuView(arcade.View):
         arcade.set_background_color(arcade.color.DARK_SLATE_GRAY)
         self.manager.enable()
 
-        self.player_name = self.load_player_name()
-        self.name_text.text = self.player_name
+        if database.is_ready():
+            self.refresh_records()
+        else:
+            arcade.schedule(self.wait_for_database, 0.05)
 
+    def wait_for_database(self, delta_time):
+        if database.is_ready():
+            arcade.unschedule(self.wait_for_database)
+            self.refresh_records()
+
+    def refresh_records(self):
         self.records = self.load_records_with_dates()
         diff_map = {"easy": "Легко", "medium": "Средне", "hard": "Сложно"}
 
@@ -246,10 +242,14 @@ class MenuView(arcade.View):
 
     def on_hide_view(self):
         self.manager.disable()
+        arcade.unschedule(self.wait_for_database)
 
     def on_resize(self, width: int, height: int):
         super().on_resize(width, height)
 
+        self.title_text.x = width // 2
+        self.title_text.y = height - 120
+
         self.name_text.x = 40
         self.name_text.y = 60
 
@@ -261,17 +261,13 @@ class MenuView(arcade.View):
 
     def on_draw(self):
         self.clear()
-        arcade.draw_text(
-            SCREEN_TITLE,
-            self.window.width // 2,
-            self.window.height - 120,
-            arcade.color.WHITE,
-            font_size=52,
-            anchor_x="center",
-            font_name="Kenney Future"
-        )
+        self.title_text.draw()
         self.manager.draw()
         self.name_text.draw()
 
         for text in self.record_texts:
             text.draw()
+
+        if self.after_first_frame is not None:
+            callback, self.after_first_frame = self.after_first_frame, None
+            callback()
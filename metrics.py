@@ -0,0 +1,136 @@
+import json
+import time
+from array import array
+from contextlib import contextmanager
+
+import numpy as np
+
+# Замеры фаз кадра без arcade: GameView оборачивает в phase() обновление
+# частиц, физику, движение труб, отрисовку и т.д., а frame() в начале
+# on_draw записывает время между кадрами. Каждая фаза пишет в свой
+# кольцевой буфер фиксированного размера; писатель один (поток игры),
+# поэтому блокировки не нужны — статистика читает снимок массива.
+#
+#   metrics.stats()      p50 / p99 / max по каждой фазе, мс
+#   metrics.histogram()  распределение времени кадра по корзинам
+#   metrics.export()     всё вместе и сырые замеры — в JSON-файл
+
+METRICS_HISTORY = 1024
+FRAME_PHASE = "frame"
+
+# Границы корзин гистограммы времени кадра, мс
+FRAME_BUDGET_MS = 16.7
+FRAME_HISTOGRAM_MS = (4.0, 8.0, 12.0, FRAME_BUDGET_MS, 20.0, 33.3, 50.0, 100.0)
+
+
+class RingBuffer:
+    def __init__(self, size=METRICS_HISTORY):
+        self.size = size
+        self.values = array("d", bytes(8 * size))
+        self.index = 0
+        self.count = 0
+
+    def add(self, value):
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def samples(self):
+        # В порядке записи: от самого старого к самому новому
+        values = np.frombuffer(self.values, dtype=np.float64).copy()
+        if self.count < self.size:
+            return values[:self.count]
+        return np.roll(values, -self.index)
+
+    def clear(self):
+        self.index = 0
+        self.count = 0
+
+
+class Metrics:
+    def __init__(self, size=METRICS_HISTORY):
+        self.size = size
+        self.buffers = {}
+        self.last_frame = None
+
+    def buffer(self, name):
+        buffer = self.buffers.get(name)
+        if buffer is None:
+            buffer = RingBuffer(self.size)
+            self.buffers[name] = buffer
+        return buffer
+
+    def add(self, name, seconds):
+        self.buffer(name).add(seconds * 1000)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def timed(self, name, func):
+        buffer = self.buffer(name)
+        perf_counter = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                buffer.add((perf_counter() - start) * 1000)
+        return wrapper
+
+    def frame(self):
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            self.add(FRAME_PHASE, now - self.last_frame)
+        self.last_frame = now
+
+    def stats(self):
+        result = {}
+        for name, buffer in self.buffers.items():
+            samples = buffer.samples()
+            if samples.size == 0:
+                continue
+            p50, p99 = np.percentile(samples, (50, 99))
+            result[name] = {
+                "count": int(samples.size),
+                "p50": float(p50),
+                "p99": float(p99),
+                "max": float(samples.max()),
+            }
+        return result
+
+    def histogram(self, edges=FRAME_HISTOGRAM_MS):
+        samples = self.buffer(FRAME_PHASE).samples()
+        bins = np.concatenate(([0.0], edges, [np.inf]))
+        counts, _ = np.histogram(samples, bins=bins)
+        labels = [f"<{edges[0]:g}"]
+        labels += [f"{low:g}-{high:g}" for low, high in zip(edges, edges[1:])]
+        labels.append(f">{edges[-1]:g}")
+        return list(zip(labels, counts.tolist()))
+
+    def export(self, path=None, extra=None):
+        if path is None:
+            path = time.strftime("metrics_%Y%m%d_%H%M%S.json")
+        data = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "unit": "ms",
+            "stats": self.stats(),
+            "frame_histogram": self.histogram(),
+            "samples": {name: buffer.samples().tolist() for name, buffer in self.buffers.items()},
+        }
+        if extra:
+            data.update(extra)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+        return path
+
+    def clear(self):
+        for buffer in self.buffers.values():
+            buffer.clear()
+        self.last_frame = None
@@ -0,0 +1,158 @@
+import arcade
+import numpy as np
+from arcade.gl import BufferDescription
+
+# Частицы хранятся столбцами в массивах NumPy фиксированного размера
+# (кольцевой буфер): новые частицы пишутся поверх самых старых, когда
+# бюджет исчерпан. На отрисовке живые частицы одним срезом массивов
+# собираются в вершинный буфер (x, y, радиус, цвет) и рисуются одним
+# вызовом: геометрический шейдер разворачивает каждую точку в квадрат,
+# фрагментный вырезает из него круг. Цикла по частицам в Python нет.
+
+PARTICLE_BUDGET = 1024
+MAX_PARTICLE_LIFE = 1.4
+
+# x, y, радиус, r, g, b, a — всё float32
+VERTEX_FORMAT = "2f 1f 4f"
+VERTEX_ATTRIBUTES = ["in_pos", "in_radius", "in_color"]
+VERTEX_FLOATS = 7
+
+VERTEX_SHADER = """
+#version 330
+in vec2 in_pos;
+in float in_radius;
+in vec4 in_color;
+out float v_radius;
+out vec4 v_color;
+
+void main() {
+    gl_Position = vec4(in_pos, 0.0, 1.0);
+    v_radius = in_radius;
+    v_color = in_color;
+}
+"""
+
+GEOMETRY_SHADER = """
+#version 330
+layout (points) in;
+layout (triangle_strip, max_vertices = 4) out;
+
+uniform WindowBlock {
+    mat4 projection;
+    mat4 view;
+} window;
+
+in float v_radius[];
+in vec4 v_color[];
+out vec2 g_offset;
+out vec4 g_color;
+
+void main() {
+    mat4 mvp = window.projection * window.view;
+    vec2 center = gl_in[0].gl_Position.xy;
+    float radius = v_radius[0];
+    vec2 corners[4] = vec2[4](vec2(-1.0, -1.0), vec2(1.0, -1.0), vec2(-1.0, 1.0), vec2(1.0, 1.0));
+    for (int i = 0; i < 4; i++) {
+        g_offset = corners[i];
+        g_color = v_color[0];
+        gl_Position = mvp * vec4(center + corners[i] * radius, 0.0, 1.0);
+        EmitVertex();
+    }
+    EndPrimitive();
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 330
+in vec2 g_offset;
+in vec4 g_color;
+out vec4 f_color;
+
+void main() {
+    if (dot(g_offset, g_offset) > 1.0) {
+        discard;
+    }
+    f_color = g_color;
+}
+"""
+
+
+class ParticleSystem:
+    def __init__(self, capacity=PARTICLE_BUDGET):
+        self.capacity = capacity
+        self.head = 0
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.dx = np.zeros(capacity)
+        self.dy = np.zeros(capacity)
+        self.life = np.zeros(capacity)
+        self.alpha = np.zeros(capacity, dtype=np.int64)
+        self.radius = np.zeros(capacity, dtype=np.float32)
+        self.rgb = np.zeros((capacity, 3), dtype=np.float32)
+
+        self.rng = np.random.default_rng()
+
+        # Вершины собираются сюда и целиком уходят в буфер видеокарты
+        self.vertices = np.zeros((capacity, VERTEX_FLOATS), dtype=np.float32)
+        self.ctx = arcade.get_window().ctx
+        self.program = self.ctx.program(
+            vertex_shader=VERTEX_SHADER,
+            geometry_shader=GEOMETRY_SHADER,
+            fragment_shader=FRAGMENT_SHADER,
+        )
+        self.buffer = self.ctx.buffer(reserve=self.vertices.nbytes)
+        self.geometry = self.ctx.geometry(
+            [BufferDescription(self.buffer, VERTEX_FORMAT, VERTEX_ATTRIBUTES)],
+            mode=self.ctx.POINTS,
+        )
+
+    def __len__(self):
+        return int(np.count_nonzero(self.life > 0))
+
+    def emit(self, x, y, count, dx_range, dy_range, size_range, life_range, colors):
+        count = min(count, self.capacity)
+        slots = (self.head + np.arange(count)) % self.capacity
+        self.head = (self.head + count) % self.capacity
+
+        rng = self.rng
+        self.x[slots] = x
+        self.y[slots] = y
+        self.dx[slots] = rng.uniform(*dx_range, count)
+        self.dy[slots] = rng.uniform(*dy_range, count)
+        self.life[slots] = rng.uniform(*life_range, count)
+        self.alpha[slots] = 255
+
+        self.radius[slots] = rng.uniform(*size_range, count)
+        palette = np.array([tuple(color)[:3] for color in colors], dtype=np.float32) / 255
+        self.rgb[slots] = palette[rng.integers(0, len(colors), count)]
+
+    def update(self, delta_time):
+        live = self.life > 0
+        if not live.any():
+            return
+        self.x[live] += self.dx[live] * 60 * delta_time
+        self.y[live] += self.dy[live] * 60 * delta_time
+        self.dy[live] -= 18 * delta_time
+        self.life[live] -= delta_time
+        self.alpha[live] = (255 * np.clip(self.life[live] / MAX_PARTICLE_LIFE, 0, None)).astype(np.int64)
+
+    def draw(self):
+        slots = np.nonzero(self.life > 0)[0]
+        count = slots.size
+        if count == 0:
+            return
+        vertices = self.vertices[:count]
+        vertices[:, 0] = self.x[slots]
+        vertices[:, 1] = self.y[slots]
+        vertices[:, 2] = self.radius[slots]
+        vertices[:, 3:6] = self.rgb[slots]
+        vertices[:, 6] = self.alpha[slots] / 255
+        self.buffer.write(vertices)
+
+        with self.ctx.enabled(self.ctx.BLEND):
+            self.ctx.blend_func = self.ctx.BLEND_DEFAULT
+            self.geometry.render(self.program, vertices=count)
+
+    def clear(self):
+        self.life[:] = 0
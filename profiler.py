@@ -0,0 +1,130 @@
+import atexit
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Профилирование прямо в запущенной игре: F5 в игре или
+# python main.py --profile N. Следующие N секунд работы arcade.run()
+# пишутся сразу двумя способами:
+#   - cProfile по главному потоку -> .pstats (python -m pstats, snakeviz);
+#   - выборка стека главного потока раз в SAMPLE_INTERVAL секунд ->
+#     .collapsed ("кадр;кадр;кадр число" — формат flamegraph.pl / speedscope).
+# В имя файлов попадают сложность, скин и наибольшее число живых частиц
+# за время замера.
+
+PROFILE_DIR = "profiles"
+DEFAULT_PROFILE_SECONDS = 10
+SAMPLE_INTERVAL = 0.005
+
+_capture = None
+
+
+def frame_name(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class ProfileCapture:
+    def __init__(self, seconds, tags=None, out_dir=PROFILE_DIR):
+        self.seconds = seconds
+        self.tags = tags
+        self.out_dir = out_dir
+        self.profile = cProfile.Profile()
+        self.stacks = Counter()
+        self.max_particles = 0
+        self.running = False
+        self.thread_id = threading.get_ident()
+        self.sampler = None
+        self.started = None
+
+    def current_tags(self):
+        tags = self.tags() if self.tags is not None else {}
+        self.max_particles = max(self.max_particles, tags.get("particles", 0))
+        return tags
+
+    def start(self):
+        # Вызывать из главного потока: cProfile видит только поток, в
+        # котором его включили.
+        self.thread_id = threading.get_ident()
+        self.current_tags()
+        self.running = True
+        self.started = time.perf_counter()
+        self.sampler = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+        self.sampler.start()
+        self.profile.enable()
+
+    def _sample(self):
+        while self.running:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    stack.append(frame_name(frame))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+            time.sleep(SAMPLE_INTERVAL)
+
+    def stop(self):
+        if not self.running:
+            return None
+        self.profile.disable()
+        self.running = False
+        self.sampler.join()
+        elapsed = time.perf_counter() - self.started
+
+        tags = self.current_tags()
+        stem = "_".join([
+            "profile",
+            time.strftime("%Y%m%d_%H%M%S"),
+            str(tags.get("difficulty", "unknown")),
+            str(tags.get("skin", "unknown")),
+            f"p{self.max_particles}",
+        ])
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, stem)
+
+        self.profile.dump_stats(base + ".pstats")
+        with open(base + ".collapsed", "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+        print(f"Профиль за {elapsed:.1f} с ({sum(self.stacks.values())} выборок): {base}.pstats, {base}.collapsed")
+        return base
+
+
+def start_capture(seconds=DEFAULT_PROFILE_SECONDS, tags=None, schedule=None):
+    # schedule(callback, delay) — обычно arcade.schedule_once: остановка
+    # придёт из главного цикла, а не из чужого потока.
+    global _capture
+    if _capture is not None and _capture.running:
+        print("Профилирование уже идёт")
+        return None
+    _capture = ProfileCapture(seconds, tags)
+    _capture.start()
+    print(f"Профилирование: {seconds} с")
+    if schedule is not None:
+        schedule(lambda delta_time: stop_capture(), seconds)
+    return _capture
+
+
+def stop_capture():
+    if _capture is not None:
+        return _capture.stop()
+    return None
+
+
+def sample_tags():
+    # Число частиц меняется от кадра к кадру: GameView вызывает это в
+    # on_update, пока идёт замер, чтобы в имя попал максимум.
+    if _capture is not None and _capture.running:
+        _capture.current_tags()
+
+
+def is_running():
+    return _capture is not None and _capture.running
+
+
+atexit.register(stop_capture)
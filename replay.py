@@ -0,0 +1,226 @@
+import argparse
+import struct
+
+from simulation import FlappySim, PLAYER_SCALE
+from hitboxes import DEFAULT_HIT_BOX_MODE, load_hit_boxes
+
+# Повтор забега: всё, что нужно, чтобы заново прогнать его в
+# детерминированной FlappySim, — сид трассы, сложность, размер окна,
+# скин и режим хитбоксов (от них зависят столкновения) и номера шагов
+# физики, на которых был взмах. Номера хранятся разностями в varint,
+# поэтому забег на пару сотен труб занимает несколько сотен байт.
+#
+# Формат (little-endian):
+#   b"FBRP" | версия u8 | сложность u8 | сид u64 | ширина u16 | высота u16
+#   | шагов всего u32 | скин: u8 длина + utf-8 | режим: u8 длина + utf-8
+#   | взмахов varint | разности номеров шагов varint...
+#
+#   python replay.py 1234               пересчитать игру 1234 из game.db
+#   python replay.py 1234 --seek 3000   состояние на шаге 3000
+
+REPLAY_MAGIC = b"FBRP"
+REPLAY_VERSION = 1
+DIFFICULTY_CODES = ("easy", "medium", "hard")
+
+# Ключевой кадр каждые 10 секунд игры: перемотка восстанавливает
+# ближайший и досчитывает не больше KEYFRAME_INTERVAL шагов.
+KEYFRAME_INTERVAL = 600
+
+_HEADER = struct.Struct("<4sBBQHHI")
+
+
+class ReplayError(ValueError):
+    pass
+
+
+def write_varint(out, value):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ReplayError("Повтор обрезан")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def _write_string(out, text):
+    raw = text.encode("utf-8")
+    out.append(len(raw))
+    out += raw
+
+
+def _read_string(data, pos):
+    if pos >= len(data):
+        raise ReplayError("Повтор обрезан")
+    length = data[pos]
+    end = pos + 1 + length
+    if end > len(data):
+        raise ReplayError("Повтор обрезан")
+    return data[pos + 1:end].decode("utf-8"), end
+
+
+class Replay:
+    def __init__(self, seed, difficulty, width, height, skin, mode, flaps, steps):
+        self.seed = seed
+        self.difficulty = difficulty
+        self.width = width
+        self.height = height
+        self.skin = skin
+        self.mode = mode
+        self.flaps = list(flaps)
+        self.steps = steps
+
+    def to_bytes(self):
+        out = bytearray(_HEADER.pack(
+            REPLAY_MAGIC,
+            REPLAY_VERSION,
+            DIFFICULTY_CODES.index(self.difficulty),
+            self.seed,
+            self.width,
+            self.height,
+            self.steps,
+        ))
+        _write_string(out, self.skin)
+        _write_string(out, self.mode)
+        write_varint(out, len(self.flaps))
+        previous = 0
+        for step in self.flaps:
+            write_varint(out, step - previous)
+            previous = step
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < _HEADER.size:
+            raise ReplayError("Повтор обрезан")
+        magic, version, difficulty, seed, width, height, steps = _HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC:
+            raise ReplayError("Это не повтор")
+        if version != REPLAY_VERSION:
+            raise ReplayError(f"Неизвестная версия повтора: {version}")
+        if difficulty >= len(DIFFICULTY_CODES):
+            raise ReplayError(f"Неизвестная сложность: {difficulty}")
+
+        pos = _HEADER.size
+        skin, pos = _read_string(data, pos)
+        mode, pos = _read_string(data, pos)
+        count, pos = read_varint(data, pos)
+        flaps = []
+        step = 0
+        for _ in range(count):
+            delta, pos = read_varint(data, pos)
+            step += delta
+            flaps.append(step)
+        return cls(seed, DIFFICULTY_CODES[difficulty], width, height, skin, mode, flaps, steps)
+
+
+class ReplayRecorder:
+    # Создаётся сразу после sim.reset(): запоминает параметры трассы и
+    # номера шагов, на которых в sim.step() ушёл взмах.
+    def __init__(self, sim, skin, mode=DEFAULT_HIT_BOX_MODE):
+        self.sim = sim
+        self.seed = sim.seed
+        self.difficulty = sim.difficulty
+        self.width = int(sim.width)
+        self.height = int(sim.height)
+        self.skin = skin
+        self.mode = mode
+        self.flaps = []
+
+    def flap(self, step):
+        self.flaps.append(step)
+
+    def finish(self):
+        return Replay(
+            self.seed, self.difficulty, self.width, self.height,
+            self.skin, self.mode, self.flaps, self.sim.steps,
+        )
+
+
+class ReplayPlayer:
+    # Прогон повтора без окна, со скоростью, ограниченной только Python:
+    # один шаг FlappySim — десятки микросекунд против 16.7 мс реального кадра.
+    def __init__(self, replay, hit_boxes=None, keyframe_interval=KEYFRAME_INTERVAL):
+        if hit_boxes is None:
+            hit_boxes = load_hit_boxes(replay.skin, PLAYER_SCALE, replay.mode)
+        self.replay = replay
+        self.flaps = frozenset(replay.flaps)
+        self.keyframe_interval = keyframe_interval
+        self.sim = FlappySim(replay.width, replay.height, replay.difficulty, hit_boxes=hit_boxes, seed=replay.seed)
+        self.keyframes = {0: self.sim.snapshot()}
+
+    def step(self):
+        sim = self.sim
+        if sim.steps % self.keyframe_interval == 0 and sim.steps not in self.keyframes:
+            self.keyframes[sim.steps] = sim.snapshot()
+        return sim.step(sim.steps in self.flaps)
+
+    def run(self, until=None):
+        if until is None:
+            until = self.replay.steps
+        sim = self.sim
+        while not sim.game_over and sim.steps < until:
+            self.step()
+        return sim.score
+
+    def seek(self, step):
+        # Ближайший ключевой кадр не позже step; дальше — обычный прогон,
+        # попутно запоминая новые ключевые кадры.
+        base = max(frame for frame in self.keyframes if frame <= step)
+        if not (base <= self.sim.steps <= step):
+            self.sim.restore(self.keyframes[base])
+        return self.run(step)
+
+
+def main():
+    import database
+
+    parser = argparse.ArgumentParser(description="Пересчитать сохранённый забег")
+    parser.add_argument("game_id", type=int)
+    parser.add_argument("--db", default=database.DB_FILE)
+    parser.add_argument("--seek", type=int, help="показать состояние на этом шаге физики")
+    args = parser.parse_args()
+
+    conn = database.connect_readonly(args.db)
+    row = conn.execute(database.GAME_REPLAY_SQL, (args.game_id,)).fetchone()
+    conn.close()
+    if row is None:
+        raise SystemExit(f"Игра {args.game_id} не найдена")
+    player_name, score, data = row
+    if data is None:
+        raise SystemExit(f"У игры {args.game_id} нет повтора")
+
+    replay = Replay.from_bytes(data)
+    print(f"{player_name}: счёт {score}, {replay.difficulty}, сид {replay.seed}, "
+          f"{replay.width}x{replay.height}, скин {replay.skin}, "
+          f"{len(replay.flaps)} взмахов, {replay.steps} шагов, {len(data)} байт")
+
+    player = ReplayPlayer(replay)
+    if args.seek is not None:
+        player.seek(args.seek)
+        sim = player.sim
+        print(f"шаг {sim.steps}: y={sim.bird_y:.1f} vy={sim.bird_vy:.2f} счёт {sim.score}, "
+              f"труб на экране {len(sim.pipes)}" + (", конец игры" if sim.game_over else ""))
+        return
+
+    replayed = player.run()
+    verdict = "совпадает" if replayed == score and player.sim.game_over else "НЕ СОВПАДАЕТ"
+    print(f"повтор: счёт {replayed}, шагов {player.sim.steps} — {verdict}")
+
+
+if __name__ == "__main__":
+    main()
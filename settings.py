@@ -1,16 +1,7 @@
 import arcade
 import arcade.gui
-import json
 from styles import BUTTON_STYLE
-
-SETTINGS_FILE = "settings.txt"
-
-DEFAULT_SETTINGS = {
-    "difficulty": "medium",
-    "volume": 80,
-    "skin": "robot",
-    "player_name": "Игрок"
-}
+import settings_store
 
 class SettingsView(arcade.View):
     def __init__(self):
@@ -19,7 +10,7 @@ class SettingsView(arcade.View):
         self.manager = arcade.gui.UIManager()
         self.manager.enable()
 
-        self.settings = self.load_settings()
+        self.settings = settings_store.get_settings()
 
         self.v_box = arcade.gui.UIBoxLayout(
             orientation="vertical",
@@ -49,7 +40,7 @@ class SettingsView(arcade.View):
         self.v_box.add(name_label)
 
         self.name_input = arcade.gui.UIInputText(
-            text=self.settings.get("player_name", "Игрок"),
+            text=self.settings.player_name,
             width=320,
             height=50,
             font_size=24,
@@ -75,7 +66,7 @@ class SettingsView(arcade.View):
                 width=180,
                 height=60,
                 style={
-                    "normal": arcade.gui.UIFlatButton.UIStyle(bg=arcade.color.DARK_GRAY if diff.lower() != self.settings["difficulty"] else arcade.color.DARK_GREEN),
+                    "normal": arcade.gui.UIFlatButton.UIStyle(bg=arcade.color.DARK_GRAY if diff.lower() != self.settings.difficulty else arcade.color.DARK_GREEN),
                     "hover": arcade.gui.UIFlatButton.UIStyle(bg=arcade.color.GRAY),
                     "press": arcade.gui.UIFlatButton.UIStyle(bg=arcade.color.DIM_GRAY)
                 }
@@ -87,7 +78,7 @@ class SettingsView(arcade.View):
         self.v_box.add(arcade.gui.UISpace(height=20))
 
         volume_label = arcade.gui.UILabel(
-            text=f"Громкость: {self.settings['volume']}%",
+            text=f"Громкость: {self.settings.volume}%",
             text_color=arcade.color.WHITE,
             font_size=28,
             width=400
@@ -97,7 +88,7 @@ class SettingsView(arcade.View):
         volume_slider = arcade.gui.UISlider(
             min_value=0,
             max_value=100,
-            value=self.settings["volume"],
+            value=self.settings.volume,
             width=400,
             height=30
         )
@@ -121,7 +112,7 @@ class SettingsView(arcade.View):
                 width=180,
                 height=60,
                 style={
-                    "normal": arcade.gui.UIFlatButton.UIStyle(bg=arcade.color.DARK_GRAY if skin != self.settings["skin"] else arcade.color.DARK_BLUE),
+                    "normal": arcade.gui.UIFlatButton.UIStyle(bg=arcade.color.DARK_GRAY if skin != self.settings.skin else arcade.color.DARK_BLUE),
                     "hover": arcade.gui.UIFlatButton.UIStyle(bg=arcade.color.GRAY),
                     "press": arcade.gui.UIFlatButton.UIStyle(bg=arcade.color.DIM_GRAY)
                 }
@@ -145,42 +136,28 @@ class SettingsView(arcade.View):
         anchor.add(child=self.v_box, anchor_x="center_x", anchor_y="center_y")
         self.manager.add(anchor)
 
-    def load_settings(self):
-        try:
-            with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return DEFAULT_SETTINGS.copy()
-
-    def save_settings(self):
-        with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-            json.dump(self.settings, f, indent=4, ensure_ascii=False)
-
     def on_name_change(self, event):
-        self.settings["player_name"] = self.name_input.text.strip() or "Игрок"
-        self.save_settings()
+        # Только в память; на диск — с задержкой или при выходе с экрана
+        self.settings.set("player_name", self.name_input.text)
 
     def on_difficulty_click(self, event):
         btn = event.source
-        self.settings["difficulty"] = btn.difficulty
-        self.save_settings()
+        self.settings.set("difficulty", btn.difficulty)
         for child in btn.parent.children:
             if hasattr(child, "difficulty"):
-                child.style["normal"]["bg"] = arcade.color.DARK_GREEN if child.difficulty == self.settings["difficulty"] else arcade.color.DARK_GRAY
+                child.style["normal"]["bg"] = arcade.color.DARK_GREEN if child.difficulty == self.settings.difficulty else arcade.color.DARK_GRAY
 
     def on_volume_change(self, event, label):
         value = int(event.new_value)
-        self.settings["volume"] = value
+        self.settings.set("volume", value)
         label.text = f"Громкость: {value}%"
-        self.save_settings()
 
     def on_skin_click(self, event):
         btn = event.source
-        self.settings["skin"] = btn.skin
-        self.save_settings()
+        self.settings.set("skin", btn.skin)
         for child in btn.parent.children:
             if hasattr(child, "skin"):
-                child.style["normal"]["bg"] = arcade.color.DARK_BLUE if child.skin == self.settings["skin"] else arcade.color.DARK_GRAY
+                child.style["normal"]["bg"] = arcade.color.DARK_BLUE if child.skin == self.settings.skin else arcade.color.DARK_GRAY
 
     def on_back_click(self, event):
         self.window.show_view(self.window.menu_view)
@@ -191,6 +168,7 @@ class SettingsView(arcade.View):
 
     def on_hide_view(self):
         self.manager.disable()
+        settings_store.flush()
 
     def on_draw(self):
         self.clear()
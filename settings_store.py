@@ -0,0 +1,166 @@
+import atexit
+import json
+import os
+import threading
+import weakref
+
+import arcade
+
+# Настройки читаются из settings.txt один раз при старте и дальше живут
+# в одном объекте Settings: поля типизированы и проверяются при записи,
+# а экраны подписываются на изменения вместо перечитывания файла.
+#
+# Изменения (ползунок громкости, ввод имени) не пишутся на диск сразу:
+# запись откладывается на SAVE_DELAY секунд после последнего изменения
+# (arcade.schedule_once, в главном цикле — без потока на каждое нажатие)
+# или делается при выходе из экрана настроек. Файл заменяется атомарно
+# (временный файл + os.replace), поэтому падение посреди записи не
+# оставляет обрезанный JSON.
+
+SETTINGS_FILE = "settings.txt"
+SAVE_DELAY = 0.5
+
+DIFFICULTIES = ("easy", "medium", "hard")
+SKINS = ("robot", "bird", "plane")
+DEFAULT_PLAYER_NAME = "Игрок"
+
+DEFAULT_SETTINGS = {
+    "difficulty": "medium",
+    "volume": 80,
+    "skin": "robot",
+    "player_name": DEFAULT_PLAYER_NAME
+}
+
+_settings = None
+
+
+def coerce(name, value):
+    if name == "difficulty":
+        value = str(value)
+        if value not in DIFFICULTIES:
+            raise ValueError(f"Неизвестная сложность: {value}")
+    elif name == "skin":
+        value = str(value)
+        if value not in SKINS:
+            raise ValueError(f"Неизвестный скин: {value}")
+    elif name == "volume":
+        value = min(100, max(0, int(value)))
+    elif name == "player_name":
+        value = str(value).strip() or DEFAULT_PLAYER_NAME
+    else:
+        raise KeyError(name)
+    return value
+
+
+class Settings:
+    def __init__(self, path=SETTINGS_FILE, delay=SAVE_DELAY):
+        self.path = path
+        self.delay = delay
+        # lock — поля и флаг dirty; write_lock — сама запись файла, чтобы
+        # set() не ждал диска, а два flush() не писали старый снимок поверх нового
+        self.lock = threading.RLock()
+        self.write_lock = threading.Lock()
+        self.dirty = False
+        self.observers = []
+
+        self.difficulty = DEFAULT_SETTINGS["difficulty"]
+        self.volume = DEFAULT_SETTINGS["volume"]
+        self.skin = DEFAULT_SETTINGS["skin"]
+        self.player_name = DEFAULT_SETTINGS["player_name"]
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                loaded = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if not isinstance(loaded, dict):
+            return
+        # Испорченное поле оставляем по умолчанию, остальные берём из файла
+        for name in DEFAULT_SETTINGS:
+            if name in loaded:
+                try:
+                    setattr(self, name, coerce(name, loaded[name]))
+                except (ValueError, TypeError):
+                    pass
+
+    def to_dict(self):
+        with self.lock:
+            return {name: getattr(self, name) for name in DEFAULT_SETTINGS}
+
+    def set(self, name, value):
+        value = coerce(name, value)
+        with self.lock:
+            if getattr(self, name) == value:
+                return
+            setattr(self, name, value)
+            self.dirty = True
+            self.schedule_save()
+        self.notify(name, value)
+
+    def subscribe(self, callback, *names):
+        # Методы объектов держим по слабой ссылке: закрытый экран не
+        # должен жить вечно только из-за подписки.
+        if hasattr(callback, "__self__"):
+            ref = weakref.WeakMethod(callback)
+        else:
+            ref = lambda: callback
+        self.observers.append((ref, names))
+        return callback
+
+    def unsubscribe(self, callback):
+        self.observers = [
+            (ref, names) for ref, names in self.observers
+            if ref() is not None and ref() != callback
+        ]
+
+    def notify(self, name, value):
+        for ref, names in list(self.observers):
+            callback = ref()
+            if callback is not None and (not names or name in names):
+                callback(name, value)
+        self.observers = [(ref, names) for ref, names in self.observers if ref() is not None]
+
+    def schedule_save(self):
+        arcade.unschedule(self.save_later)
+        arcade.schedule_once(self.save_later, self.delay)
+
+    def save_later(self, delta_time):
+        self.flush()
+
+    def flush(self):
+        arcade.unschedule(self.save_later)
+        with self.write_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                data = json.dumps(self.to_dict(), indent=4, ensure_ascii=False)
+                self.dirty = False
+
+            tmp_path = self.path + ".tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                with self.lock:
+                    self.dirty = True
+                print("Ошибка сохранения настроек:", e)
+
+
+def get_settings():
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
+
+
+def flush():
+    if _settings is not None:
+        _settings.flush()
+
+
+atexit.register(flush)
@@ -0,0 +1,300 @@
+import math
+
+from levelgen import (
+    BASE_PIPE_INTERVAL,
+    PIPE_MARGIN,
+    DIFFICULTY_PARAMS,
+    difficulty_params,
+    get_schedule,
+    random_seed,
+)
+
+# Правила игры без arcade: этот модуль можно гонять на машинах без окна
+# и видеокарты, GameView только рисует его состояние.
+
+BASE_GRAVITY = 0.4
+BASE_JUMP_POWER = 9
+BASE_PIPE_SPEED = 3.8
+BASE_PIPE_WIDTH = 90
+
+ANIMATION_SPEED = 0.12
+ANIMATION_FRAME_COUNT = 3
+
+ANGLE_LERP_SPEED = 8.0
+
+PHYSICS_FPS = 60
+PHYSICS_DT = 1.0 / PHYSICS_FPS
+
+PLAYER_X = 250
+PLAYER_SCALE = 0.15
+PIPE_SPAWN_OFFSET = 200
+
+# Прямоугольник кадра robot1.png в масштабе PLAYER_SCALE — хитбокс
+# по умолчанию, когда текстур под рукой нет.
+DEFAULT_HIT_BOX = ((-33.0, -23.0), (33.0, -23.0), (33.0, 23.0), (-33.0, 23.0))
+
+EVENT_FLAP = "flap"
+EVENT_SPAWN = "spawn"
+EVENT_SCORE = "score"
+EVENT_HIT = "hit"
+
+
+def polygons_intersect(poly_a, poly_b):
+    # Та же теорема о разделяющей оси, что и в arcade.are_polygons_intersecting,
+    # чтобы без окна столкновения считались так же, как в игре.
+    for polygon in (poly_a, poly_b):
+        count = len(polygon)
+        for i in range(count):
+            x1, y1 = polygon[i]
+            x2, y2 = polygon[(i + 1) % count]
+            nx = y2 - y1
+            ny = x1 - x2
+
+            min_a = max_a = nx * poly_a[0][0] + ny * poly_a[0][1]
+            for x, y in poly_a:
+                projected = nx * x + ny * y
+                if projected < min_a:
+                    min_a = projected
+                elif projected > max_a:
+                    max_a = projected
+
+            min_b = max_b = nx * poly_b[0][0] + ny * poly_b[0][1]
+            for x, y in poly_b:
+                projected = nx * x + ny * y
+                if projected < min_b:
+                    min_b = projected
+                elif projected > max_b:
+                    max_b = projected
+
+            if max_a <= min_b or max_b <= min_a:
+                return False
+    return True
+
+
+class PipePair:
+    __slots__ = ("x", "gap_y", "gap", "height")
+
+    def __init__(self, x, gap_y, gap, height):
+        self.x = x
+        self.gap_y = gap_y
+        self.gap = gap
+        self.height = height
+
+    @property
+    def left(self):
+        return self.x - BASE_PIPE_WIDTH / 2
+
+    @property
+    def right(self):
+        return self.x + BASE_PIPE_WIDTH / 2
+
+    @property
+    def bottom_height(self):
+        return self.gap_y
+
+    @property
+    def top_height(self):
+        return self.height - (self.gap_y + self.gap)
+
+    def polygons(self):
+        left = self.left
+        right = self.right
+        top_y = self.gap_y + self.gap
+        bottom = ((left, 0), (right, 0), (right, self.gap_y), (left, self.gap_y))
+        top = ((left, top_y), (right, top_y), (right, self.height), (left, self.height))
+        return bottom, top
+
+
+class FlappySim:
+    def __init__(self, width, height, difficulty="medium", hit_boxes=None, seed=None):
+        self.width = width
+        self.height = height
+        self.gravity = BASE_GRAVITY
+        self.set_difficulty(difficulty)
+        self.set_hit_boxes(hit_boxes)
+
+        # seed=None — каждый reset() строит новую случайную трассу;
+        # заданный сид повторяет одну и ту же трассу при каждом перезапуске.
+        self.base_seed = seed
+        self.reset()
+
+    # Смена сложности и хитбоксов вступает в силу со следующего reset()
+
+    def set_difficulty(self, difficulty):
+        self.difficulty = difficulty
+        params = difficulty_params(difficulty)
+        self.pipe_interval = params["pipe_interval"]
+        self.pipe_gap = params["pipe_gap"]
+
+    def set_hit_boxes(self, hit_boxes):
+        # По хитбоксу на каждый кадр анимации: кадры разного размера,
+        # и в игре столкновение проверяется по текущему кадру.
+        if hit_boxes is None:
+            hit_boxes = [DEFAULT_HIT_BOX] * ANIMATION_FRAME_COUNT
+        self.hit_boxes = [tuple(box) for box in hit_boxes]
+
+    def reset(self, seed=None):
+        if seed is None:
+            seed = self.base_seed if self.base_seed is not None else random_seed()
+        self.seed = seed
+        self.schedule = get_schedule(seed, self.difficulty, self.height)
+        self.pipes_spawned = 0
+
+        self.bird_y = self.height // 2
+        self.prev_bird_y = self.bird_y
+        self.bird_vy = 0
+        self.bird_angle = 0
+
+        self.frame = 0
+        self.animation_timer = 0.0
+
+        self.pipes = []
+        self.time = 0.0
+        self.last_pipe_time = 0.0
+        self.steps = 0
+
+        self.score = 0
+        self.game_over = False
+        self.events = []
+
+    def snapshot(self):
+        # Полное состояние шага для ключевых кадров при перемотке повтора;
+        # трасса (schedule) восстанавливается по сиду.
+        return (
+            self.seed, self.pipes_spawned,
+            self.bird_y, self.prev_bird_y, self.bird_vy, self.bird_angle,
+            self.frame, self.animation_timer,
+            tuple((pipe.x, pipe.gap_y, pipe.gap, pipe.height) for pipe in self.pipes),
+            self.time, self.last_pipe_time, self.steps,
+            self.score, self.game_over,
+        )
+
+    def restore(self, state):
+        (
+            seed, self.pipes_spawned,
+            self.bird_y, self.prev_bird_y, self.bird_vy, self.bird_angle,
+            self.frame, self.animation_timer,
+            pipes,
+            self.time, self.last_pipe_time, self.steps,
+            self.score, self.game_over,
+        ) = state
+        self.seed = seed
+        self.schedule = get_schedule(seed, self.difficulty, self.height)
+        self.pipes = [PipePair(*pipe) for pipe in pipes]
+        self.events = []
+
+    def bird_polygon(self):
+        rad = math.radians(-self.bird_angle)
+        cos_a = math.cos(rad)
+        sin_a = math.sin(rad)
+        y0 = self.bird_y
+        return [
+            (x * cos_a - y * sin_a + PLAYER_X, x * sin_a + y * cos_a + y0)
+            for x, y in self.hit_boxes[self.frame % len(self.hit_boxes)]
+        ]
+
+    def step(self, action=False):
+        self.events = []
+        if self.game_over:
+            return self.events
+
+        if action:
+            self.bird_vy = BASE_JUMP_POWER
+            self.events.append(EVENT_FLAP)
+
+        self.steps += 1
+        self.prev_bird_y = self.bird_y
+        self.bird_vy -= self.gravity
+        self.bird_y += self.bird_vy
+
+        if self.bird_vy > 0:
+            target_angle = -35
+        else:
+            fall_factor = min(1.0, abs(self.bird_vy) / 12.0)
+            target_angle = 70 * fall_factor
+
+        self.bird_angle += (target_angle - self.bird_angle) * ANGLE_LERP_SPEED * PHYSICS_DT
+        self.bird_angle = max(-90, min(45, self.bird_angle))
+
+        polygon = self.bird_polygon()
+        ys = [y for _, y in polygon]
+        if max(ys) < 0 or min(ys) > self.height:
+            self.game_over = True
+            self.events.append(EVENT_HIT)
+            return self.events
+
+        for pipe in self.pipes:
+            pipe.x -= BASE_PIPE_SPEED
+
+        while self.pipes and self.pipes[0].right < 0:
+            self.pipes.pop(0)
+            self.score += 1
+            self.events.append(EVENT_SCORE)
+
+        self.time += PHYSICS_DT
+        if self.time - self.last_pipe_time > self.pipe_interval:
+            self.spawn_pipe()
+            self.last_pipe_time = self.time
+
+        self.animation_timer += PHYSICS_DT
+        if self.animation_timer >= ANIMATION_SPEED:
+            self.animation_timer -= ANIMATION_SPEED
+            self.frame = (self.frame + 1) % ANIMATION_FRAME_COUNT
+            polygon = self.bird_polygon()
+
+        if self.check_collisions(polygon):
+            self.game_over = True
+            self.events.append(EVENT_HIT)
+
+        return self.events
+
+    def next_gap_y(self):
+        gap_y = self.schedule.gap(self.pipes_spawned)
+        self.pipes_spawned += 1
+        return gap_y
+
+    def spawn_pipe(self):
+        gap_y = self.next_gap_y()
+        pipe = PipePair(self.width + PIPE_SPAWN_OFFSET, gap_y, self.pipe_gap, self.height)
+        self.pipes.append(pipe)
+        self.events.append(EVENT_SPAWN)
+        return pipe
+
+    def next_pipe(self):
+        # Ближайшая пара, которую птица ещё не пролетела
+        for pipe in self.pipes:
+            if pipe.right >= PLAYER_X:
+                return pipe
+        return None
+
+    def check_collisions(self, polygon=None):
+        if polygon is None:
+            polygon = self.bird_polygon()
+
+        left = right = polygon[0][0]
+        bottom = top = polygon[0][1]
+        for x, y in polygon:
+            if x < left:
+                left = x
+            elif x > right:
+                right = x
+            if y < bottom:
+                bottom = y
+            elif y > top:
+                top = y
+
+        # Широкая фаза: трубы едут одной колонной и отсортированы по x, так что
+        # пролетевшие пропускаем, а на первой паре правее птицы останавливаемся.
+        # До точной проверки многоугольников доходят одна-две пары за шаг.
+        for pipe in self.pipes:
+            if pipe.right <= left:
+                continue
+            if pipe.left >= right:
+                break
+            # AABB: нижняя труба от 0 до gap_y, верхняя от gap_y + gap до верха
+            bottom_pipe, top_pipe = pipe.polygons()
+            if bottom < pipe.gap_y and polygons_intersect(polygon, bottom_pipe):
+                return True
+            if top > pipe.gap_y + pipe.gap and polygons_intersect(polygon, top_pipe):
+                return True
+        return False
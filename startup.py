@@ -0,0 +1,83 @@
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Замер холодного старта. phase() записывает этапы (окно, меню, фоновая
+# загрузка), а trace_imports() считает время импорта каждого модуля так
+# же, как python -X importtime: self и cumulative в микросекундах,
+# вложенные импорты — с отступом, дочерние перед родителем.
+#
+#   python main.py --startup-report
+
+PROCESS_START = time.perf_counter()
+IMPORT_REPORT_MIN_US = 1000
+
+_phases = []
+_imports = []
+_stack = []
+_original_import = None
+
+
+def elapsed_ms():
+    return (time.perf_counter() - PROCESS_START) * 1000
+
+
+@contextmanager
+def phase(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        _phases.append((name, (start - PROCESS_START) * 1000, (end - start) * 1000, threading.current_thread().name))
+
+
+def mark(name):
+    _phases.append((name, elapsed_ms(), 0.0, threading.current_thread().name))
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Уже загруженные модули, относительные импорты и импорты из фоновых
+    # потоков пропускаем: иначе перепутается стек вложенности.
+    if level or name in sys.modules or threading.current_thread() is not threading.main_thread():
+        return _original_import(name, globals, locals, fromlist, level)
+
+    _stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        cumulative = (time.perf_counter() - start) * 1e6
+        nested = _stack.pop()
+        if _stack:
+            _stack[-1] += cumulative
+        _imports.append((len(_stack), cumulative - nested, cumulative, name))
+
+
+def trace_imports():
+    global _original_import
+    if _original_import is None:
+        _original_import = builtins.__import__
+        builtins.__import__ = _timed_import
+
+
+def stop_tracing_imports():
+    global _original_import
+    if _original_import is not None:
+        builtins.__import__ = _original_import
+        _original_import = None
+
+
+def report(file=None, min_us=IMPORT_REPORT_MIN_US):
+    file = file or sys.stderr
+    print("startup: start [ms] | duration [ms] | thread       | phase", file=file)
+    for name, start, duration, thread in sorted(_phases, key=lambda p: p[1]):
+        print(f"startup: {start:11.1f} | {duration:13.1f} | {thread:<12} | {name}", file=file)
+
+    if _imports:
+        print(f"import time: self [us] | cumulative | imported package (>= {min_us} us)", file=file)
+        for depth, self_us, cumulative, name in _imports:
+            if cumulative >= min_us:
+                print(f"import time: {self_us:9.0f} | {cumulative:10.0f} | {'  ' * depth}{name}", file=file)
@@ -0,0 +1,203 @@
+import argparse
+import json
+import math
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from simulation import FlappySim, PIPE_SPAWN_OFFSET, PLAYER_X
+
+# Нейроэволюция ботов для демо-режима: популяция маленьких сетей
+# оценивается на FlappySim в пуле процессов, лучшие мутируют дальше.
+# Все воркеры в поколении играют на одних и тех же сидах труб, так что
+# фитнес разных особей можно честно сравнивать.
+
+INPUT_COUNT = 5
+HIDDEN_COUNT = 6
+GENOME_SIZE = (INPUT_COUNT + 1) * HIDDEN_COUNT + HIDDEN_COUNT + 1
+
+DEFAULT_WIDTH = 1920
+DEFAULT_HEIGHT = 1080
+DEFAULT_MAX_STEPS = 60 * 60 * 5
+
+
+class Controller:
+    def __init__(self, genome):
+        self.genome = genome
+
+    def observe(self, sim):
+        pipe = sim.next_pipe()
+        if pipe is not None:
+            dx = pipe.x - PLAYER_X
+            gap_center = pipe.gap_y + pipe.gap / 2
+        else:
+            dx = sim.width + PIPE_SPAWN_OFFSET - PLAYER_X
+            gap_center = sim.height / 2
+        return (
+            sim.bird_y / sim.height,
+            sim.bird_vy / 10.0,
+            dx / sim.width,
+            (gap_center - sim.bird_y) / sim.height,
+            sim.pipe_gap / sim.height,
+        )
+
+    def act(self, sim):
+        inputs = self.observe(sim)
+        genome = self.genome
+        pos = 0
+        output = 0.0
+        out_start = (INPUT_COUNT + 1) * HIDDEN_COUNT
+        for h in range(HIDDEN_COUNT):
+            total = genome[pos + INPUT_COUNT]
+            for i in range(INPUT_COUNT):
+                total += genome[pos + i] * inputs[i]
+            pos += INPUT_COUNT + 1
+            output += genome[out_start + h] * math.tanh(total)
+        output += genome[out_start + HIDDEN_COUNT]
+        return output > 0
+
+
+def random_genome(rng):
+    return [rng.gauss(0, 1) for _ in range(GENOME_SIZE)]
+
+
+def mutate(genome, rng, rate, strength):
+    return [
+        gene + rng.gauss(0, strength) if rng.random() < rate else gene
+        for gene in genome
+    ]
+
+
+def crossover(a, b, rng):
+    return [x if rng.random() < 0.5 else y for x, y in zip(a, b)]
+
+
+def play(genome, seed, difficulty, width, height, max_steps):
+    sim = FlappySim(width, height, difficulty, seed=seed)
+    controller = Controller(genome)
+    while not sim.game_over and sim.steps < max_steps:
+        sim.step(controller.act(sim))
+    return sim.score, sim.steps
+
+
+def evaluate_chunk(chunk, seeds, difficulty, width, height, max_steps):
+    # Выполняется в дочернем процессе: оцениваем пачку особей, чтобы не
+    # гонять каждую по отдельности через pickle.
+    results = []
+    for index, genome in chunk:
+        scores = []
+        fitness = 0.0
+        for seed in seeds:
+            score, steps = play(genome, seed, difficulty, width, height, max_steps)
+            scores.append(score)
+            fitness += score * 1000 + steps
+        results.append((index, fitness / len(seeds), statistics.mean(scores)))
+    return results
+
+
+def evaluate_population(executor, population, seeds, args, chunk_size):
+    indexed = list(enumerate(population))
+    futures = [
+        executor.submit(
+            evaluate_chunk,
+            indexed[i:i + chunk_size],
+            seeds,
+            args.difficulty,
+            args.width,
+            args.height,
+            args.max_steps,
+        )
+        for i in range(0, len(indexed), chunk_size)
+    ]
+    fitness = [0.0] * len(population)
+    scores = [0.0] * len(population)
+    for future in as_completed(futures):
+        for index, value, score in future.result():
+            fitness[index] = value
+            scores[index] = score
+    return fitness, scores
+
+
+def next_generation(population, fitness, rng, args):
+    ranked = [genome for _, genome in sorted(zip(fitness, population), key=lambda item: -item[0])]
+    elite = ranked[:args.elite]
+    parents = ranked[:max(args.elite, len(ranked) // 4)]
+    children = list(elite)
+    while len(children) < len(population):
+        a = rng.choice(parents)
+        b = rng.choice(parents)
+        children.append(mutate(crossover(a, b, rng), rng, args.mutation_rate, args.mutation_strength))
+    return children
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Обучение ботов Flappy Bird для демо-режима")
+    parser.add_argument("--population", type=int, default=200)
+    parser.add_argument("--generations", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--difficulty", choices=["easy", "medium", "hard"], default="medium")
+    parser.add_argument("--seeds", type=int, default=3, help="сколько трасс проходит каждая особь")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--width", type=int, default=DEFAULT_WIDTH)
+    parser.add_argument("--height", type=int, default=DEFAULT_HEIGHT)
+    parser.add_argument("--max-steps", type=int, default=DEFAULT_MAX_STEPS)
+    parser.add_argument("--elite", type=int, default=4)
+    parser.add_argument("--mutation-rate", type=float, default=0.15)
+    parser.add_argument("--mutation-strength", type=float, default=0.4)
+    parser.add_argument("--out", default="demo_agent.json")
+    parser.add_argument("--log", help="куда дописывать статистику поколений (JSONL)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    population = [random_genome(rng) for _ in range(args.population)]
+    workers = max(1, args.workers or 1)
+    chunk_size = max(1, math.ceil(args.population / (workers * 4)))
+
+    best = None
+    log = open(args.log, "a", encoding="utf-8") if args.log else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for generation in range(args.generations):
+                seeds = [rng.randrange(2 ** 31) for _ in range(args.seeds)]
+                started = time.perf_counter()
+                fitness, scores = evaluate_population(executor, population, seeds, args, chunk_size)
+                elapsed = time.perf_counter() - started
+
+                top = max(range(len(population)), key=fitness.__getitem__)
+                if best is None or fitness[top] > best["fitness"]:
+                    best = {
+                        "fitness": fitness[top],
+                        "score": scores[top],
+                        "generation": generation,
+                        "difficulty": args.difficulty,
+                        "genome": population[top],
+                    }
+                    with open(args.out, "w", encoding="utf-8") as f:
+                        json.dump(best, f, indent=4)
+
+                stats = {
+                    "generation": generation,
+                    "best_score": scores[top],
+                    "mean_score": statistics.mean(scores),
+                    "median_score": statistics.median(scores),
+                    "best_fitness": fitness[top],
+                    "seconds": round(elapsed, 3),
+                }
+                print(json.dumps(stats), flush=True)
+                if log:
+                    log.write(json.dumps(stats) + "\n")
+                    log.flush()
+
+                population = next_generation(population, fitness, rng, args)
+    finally:
+        if log:
+            log.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from database import DB_FILE, connect_readonly
+from hitboxes import HIT_BOX_MODES, SKIN_FRAMES, load_hit_boxes
+from replay import Replay, ReplayError, ReplayPlayer
+from simulation import PLAYER_SCALE
+
+# Аудит таблицы рекордов: каждая игра с повтором заново прогоняется в
+# FlappySim без окна, и счёт из games сравнивается со счётом повтора.
+# Игры читаются из базы порциями и раздаются пулу процессов; в очереди
+# держим не больше нескольких порций на процесс, так что память не
+# растёт с размером базы.
+#
+#   python verify_replays.py                    все игры, расхождения в stdout (CSV)
+#   python verify_replays.py --difficulty hard --out bad.csv
+#
+# Код выхода 1, если найдено хотя бы одно расхождение.
+
+DEFAULT_CHUNK_SIZE = 256
+PENDING_CHUNKS_PER_WORKER = 4
+
+STATUS_OK = "ok"
+STATUS_SCORE = "score"
+STATUS_STEPS = "steps"
+STATUS_ALIVE = "alive"
+STATUS_CORRUPT = "corrupt"
+
+REPLAYS_SQL = """
+    SELECT games.id, games.score, replays.data
+    FROM games JOIN replays ON replays.game_id = games.id
+    {where}
+    ORDER BY games.id
+"""
+
+MISSING_SQL = """
+    SELECT COUNT(*)
+    FROM games LEFT JOIN replays ON replays.game_id = games.id
+    WHERE replays.game_id IS NULL {and_where}
+"""
+
+MISMATCH_COLUMNS = ["game_id", "claimed_score", "replay_score", "replay_steps", "recorded_steps", "reason"]
+
+# Хитбоксы скина считаются один раз на процесс
+_hit_boxes = {}
+
+
+def hit_boxes_for(skin, mode):
+    key = (skin, mode)
+    boxes = _hit_boxes.get(key)
+    if boxes is None:
+        boxes = load_hit_boxes(skin, PLAYER_SCALE, mode)
+        _hit_boxes[key] = boxes
+    return boxes
+
+
+def verify_one(game_id, claimed, data):
+    corrupt = (game_id, claimed, None, None, None, STATUS_CORRUPT)
+    try:
+        replay = Replay.from_bytes(data)
+    except (ReplayError, UnicodeDecodeError):
+        return corrupt
+    # Неизвестный скин load_hit_boxes молча заменил бы хитбоксами робота
+    if replay.skin not in SKIN_FRAMES or replay.mode not in HIT_BOX_MODES:
+        return corrupt
+
+    # Одна испорченная строка не должна останавливать весь аудит
+    try:
+        player = ReplayPlayer(replay, hit_boxes_for(replay.skin, replay.mode))
+        score = player.run()
+    except (ValueError, OSError):
+        return corrupt
+    sim = player.sim
+    if score != claimed:
+        status = STATUS_SCORE
+    elif not sim.game_over:
+        status = STATUS_ALIVE
+    elif sim.steps != replay.steps:
+        status = STATUS_STEPS
+    else:
+        status = STATUS_OK
+    return (game_id, claimed, score, sim.steps, replay.steps, status)
+
+
+def verify_chunk(rows):
+    # Назад возвращаем только расхождения — их единицы, а игр сотни тысяч
+    checked = 0
+    mismatches = []
+    for game_id, claimed, data in rows:
+        result = verify_one(game_id, claimed, data)
+        checked += 1
+        if result[-1] != STATUS_OK:
+            mismatches.append(result)
+    return checked, mismatches
+
+
+def iter_chunks(conn, difficulty, limit, chunk_size):
+    params = []
+    where = ""
+    if difficulty:
+        where = "WHERE games.difficulty = ?"
+        params.append(difficulty)
+    sql = REPLAYS_SQL.format(where=where)
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    cursor = conn.execute(sql, params)
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield rows
+
+
+def count_missing(conn, difficulty):
+    if difficulty:
+        return conn.execute(MISSING_SQL.format(and_where="AND games.difficulty = ?"), (difficulty,)).fetchone()[0]
+    return conn.execute(MISSING_SQL.format(and_where="")).fetchone()[0]
+
+
+def verify(db_path, workers, difficulty=None, limit=None, chunk_size=DEFAULT_CHUNK_SIZE, on_mismatch=None):
+    conn = connect_readonly(db_path)
+    checked = 0
+    mismatches = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            max_pending = workers * PENDING_CHUNKS_PER_WORKER
+
+            def collect(done):
+                nonlocal checked
+                for future in done:
+                    count, bad = future.result()
+                    checked += count
+                    for row in bad:
+                        mismatches.append(row)
+                        if on_mismatch is not None:
+                            on_mismatch(row)
+
+            for rows in iter_chunks(conn, difficulty, limit, chunk_size):
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(executor.submit(verify_chunk, rows))
+            done, _ = wait(pending)
+            collect(done)
+
+        missing = count_missing(conn, difficulty)
+    finally:
+        conn.close()
+    return checked, mismatches, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверить счёт сохранённых игр по их повторам")
+    parser.add_argument("--db", default=DB_FILE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--difficulty", choices=["easy", "medium", "hard"])
+    parser.add_argument("--limit", type=int, help="проверить только первые N игр")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--out", help="CSV с расхождениями (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    out = open(args.out, "w", encoding="utf-8", newline="") if args.out else sys.stdout
+    writer = csv.writer(out)
+    writer.writerow(MISMATCH_COLUMNS)
+
+    start = time.perf_counter()
+    try:
+        checked, mismatches, missing = verify(
+            args.db, args.workers, args.difficulty, args.limit, args.chunk_size,
+            on_mismatch=writer.writerow,
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"Проверено {checked} игр за {elapsed:.1f} с ({checked / max(elapsed, 1e-9):.0f} игр/с, "
+        f"{args.workers} процессов): расхождений {len(mismatches)}, без повтора {missing}",
+        file=sys.stderr,
+    )
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()